@@ -1,63 +1,329 @@
+import functools
+import logging
 import os
 import re
+import threading
+import time
 import psycopg2
 import pytz
 import random # Import the random module
 import requests
 import io
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from psycopg2 import pool
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
+from slack_sdk.errors import SlackApiError
 from apscheduler.schedulers.background import BackgroundScheduler
 from PIL import Image
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Debug output is off unless LOG_LEVEL=DEBUG; messages are only formatted when their level is enabled
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+log = logging.getLogger("umabot")
+
+# --- Configuration ---
+# Read once at startup; none of these change while the bot runs.
+SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
+SLACK_APP_TOKEN = os.environ.get("SLACK_APP_TOKEN")
+DATABASE_URL = os.environ.get("DATABASE_URL")
+_missing_env_vars = [name for name, value in (("SLACK_BOT_TOKEN", SLACK_BOT_TOKEN), ("SLACK_APP_TOKEN", SLACK_APP_TOKEN), ("DATABASE_URL", DATABASE_URL)) if not value]
+if _missing_env_vars:
+    log.error("🔴 Missing required environment variables: %s. Please check your .env file.", ", ".join(_missing_env_vars))
+    raise SystemExit(1)
+
+# Bolt acks each event straight away and runs the listener on this many threads (its default is 5).
+# A listener can hold a pooled database connection, so the pool further down is sized from this.
+SLACK_LISTENER_WORKERS = 9
+
 # Initializes your app with your bot token
-app = App(token=os.environ.get("SLACK_BOT_TOKEN"))
+app = App(
+    token=SLACK_BOT_TOKEN,
+    listener_executor=ThreadPoolExecutor(max_workers=SLACK_LISTENER_WORKERS, thread_name_prefix="bolt-listener")
+)
+
+# Rate-limited (HTTP 429) Slack calls are retried up to this many times in total
+SLACK_MAX_ATTEMPTS = 5
+
+def slack_call(api_method, **kwargs):
+    """
+    Calls a Slack Web API method, waiting out any 429 rate-limit response for as long as
+    Slack's Retry-After header asks before trying again.
+    """
+    for attempt in range(1, SLACK_MAX_ATTEMPTS + 1):
+        try:
+            return api_method(**kwargs)
+        except SlackApiError as e:
+            if e.response.status_code != 429 or attempt == SLACK_MAX_ATTEMPTS:
+                raise
+            retry_after = int(e.response.headers.get('Retry-After', 1))
+            log.warning("Rate limited on %s, retrying in %ss (attempt %s/%s)", api_method.__name__, retry_after, attempt, SLACK_MAX_ATTEMPTS)
+            time.sleep(retry_after)
 
 # --- Globals & Cache ---
-BOT_USER_ID = app.client.auth_test()["user_id"]
+BOT_USER_ID = slack_call(app.client.auth_test)["user_id"]
+BOT_MENTION_PREFIX = f"<@{BOT_USER_ID}>"
+# Patterns checked on every incoming message are compiled once at startup
+SPOT_RE = re.compile(r"\b(?:spot|spotted)\b", re.IGNORECASE)
+MENTION_RE = re.compile(r"<@(\w+)>")
+LEADING_MENTION_RE = re.compile(r"^<@\w+>\s*")
 ADMIN_USER_ID = "U06HB636NHG" # Your User ID
-user_cache = {}
+# Format: {user_id: (display_name, time.time() when the entry expires)}, least recently used first
+user_cache = OrderedDict()
+user_cache_lock = threading.Lock()
+# Oldest entries are evicted beyond this size so the cache can't grow without bound
+USER_CACHE_MAX_SIZE = 2048
+USER_CACHE_TTL_SECONDS = 86400
+# Failed lookups are cached for a short time only
+USER_CACHE_NEGATIVE_TTL_SECONDS = 60
+USER_LOOKUP_WORKERS = 5
+# Shared by every resolve_user_names call; it only ever runs get_user_name for uncached IDs
+USER_LOOKUP_POOL = ThreadPoolExecutor(max_workers=USER_LOOKUP_WORKERS, thread_name_prefix="user-lookup")
+# The whole member list is reloaded from users.list this often
+USER_CACHE_REFRESH_MINUTES = 10
+# Slack API calls that nothing waits on are handed to this pool so handlers return sooner
+SLACK_IO = ThreadPoolExecutor(max_workers=4, thread_name_prefix="slack-io")
+# Format: {channel_id: frozenset of today's bonus target user IDs}. Replaced wholesale, never mutated.
 daily_bonus_users = {}
+# Format: set of message_ts values that have spot rows, so unrelated deletions never reach the
+# database. None until loaded at startup, in which case every deletion is checked in the DB.
+spot_message_timestamps = None
 # The explosion images are now loaded from a local directory
 EXPLOSIONS_DIR = "explosions"
+# The folder doesn't change while the bot runs, so it is listed once at startup.
+# None means the folder itself is missing.
+try:
+    EXPLOSION_FILES = sorted(os.path.join(EXPLOSIONS_DIR, f) for f in os.listdir(EXPLOSIONS_DIR) if f.lower().endswith('.png'))
+except FileNotFoundError:
+    log.error("🔴 Error: The directory '%s' was not found.", EXPLOSIONS_DIR)
+    EXPLOSION_FILES = None
+# Decoded once up front; handlers only ever read these (resize returns a new image)
+EXPLOSION_IMAGES = None if EXPLOSION_FILES is None else [Image.open(path).convert("RGBA") for path in EXPLOSION_FILES]
+# Private Slack file downloads share one keep-alive session, already carrying the bot token
+SLACK_FILES_SESSION = requests.Session()
+SLACK_FILES_SESSION.headers["Authorization"] = f"Bearer {SLACK_BOT_TOKEN}"
+# Seconds to wait for files.slack.com to connect or send data, so a stalled download can't hold an explode worker
+SLACK_FILES_TIMEOUT_SECONDS = 10
+EXPLOSION_MAX_SIZE = 1024  # Longest side of an exploded picture, in pixels
+# Explosion images are built on their own threads so slow downloads and Pillow work
+# don't hold up Slack event handling. These workers never touch the database.
+EXPLODE_WORKERS = ThreadPoolExecutor(max_workers=2, thread_name_prefix="explode")
+
+# --- Database Connection Pool ---
+# Connections are borrowed from a shared pool instead of opening a new one per Slack event.
+DB_POOL_MIN_CONN = 2
+# One connection per Bolt listener thread plus one for a scheduled job, so a burst of events
+# can't exhaust the pool.
+DB_POOL_MAX_CONN = SLACK_LISTENER_WORKERS + 1
+# Connections that sat idle longer than this are closed and replaced when checked out.
+DB_CONN_MAX_IDLE_SECONDS = 300
+db_pool = None
+# Format: {id(connection): time.monotonic() of when it was last returned to the pool}
+db_conn_last_used = {}
+# Server-side prepared statements for hot queries, created lazily on each connection.
+# Format: {statement_name: "(parameter types) AS statement"}
+PREPARED_STATEMENTS = {
+    "spot_insert": """(text, text, text, text, text, text, integer, integer) AS
+        INSERT INTO spots (spotter_id, spotted_id, channel_id, message_ts, image_url, season_id, spotter_points, caught_points)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (message_ts, spotted_id) DO NOTHING""",
+    "assassin_roster": """(text) AS
+        SELECT player_id, target_id, is_active, kill_count
+        FROM assassin_players
+        WHERE channel_id = $1
+        ORDER BY created_at, id""",
+    "spot_picture": """(text, text) AS
+        SELECT image_url
+        FROM spots
+        WHERE spotted_id = $1 AND channel_id = $2 AND is_valid = TRUE
+        ORDER BY random()
+        LIMIT 1""",
+    # Leaderboards: (channel_id, role, season_id, limit) and (channel_id, role, limit)
+    "leaderboard_season": """(text, text, text, integer) AS
+        SELECT user_id, score AS total_score
+        FROM spot_scores
+        WHERE channel_id = $1 AND role = $2 AND season_id = $3 AND score > 0
+        ORDER BY total_score DESC
+        LIMIT $4""",
+    "leaderboard_alltime": """(text, text, integer) AS
+        SELECT user_id, SUM(score) AS total_score
+        FROM spot_scores
+        WHERE channel_id = $1 AND role = $2
+        GROUP BY user_id
+        HAVING SUM(score) > 0
+        ORDER BY total_score DESC
+        LIMIT $3""",
+    # spot_scores has no notion of a mid-season reset, so these total up the spots since it directly.
+    # (channel_id, season_id, reset_at, limit)
+    "leaderboard_since_reset_spot": """(text, text, timestamptz, integer) AS
+        SELECT spotter_id, SUM(spotter_points) AS total_score
+        FROM spots
+        WHERE is_valid = TRUE AND channel_id = $1 AND season_id = $2 AND created_at >= $3
+        GROUP BY spotter_id
+        ORDER BY total_score DESC
+        LIMIT $4""",
+    "leaderboard_since_reset_caught": """(text, text, timestamptz, integer) AS
+        SELECT spotted_id, SUM(caught_points) AS total_score
+        FROM spots
+        WHERE is_valid = TRUE AND channel_id = $1 AND season_id = $2 AND created_at >= $3
+        GROUP BY spotted_id
+        ORDER BY total_score DESC
+        LIMIT $4""",
+}
+# Format: {id(connection): {names from PREPARED_STATEMENTS already prepared on it}}
+db_prepared_conns = {}
+
+def init_db_pool():
+    """
+    Creates the shared connection pool on first use and returns it.
+    """
+    global db_pool
+    if db_pool is None:
+        db_pool = pool.ThreadedConnectionPool(DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, dsn=DATABASE_URL)
+    return db_pool
+
+def _forget_conn(conn):
+    """
+    Drops the bookkeeping for a connection that has been closed, since its id may be reused.
+    """
+    db_conn_last_used.pop(id(conn), None)
+    db_prepared_conns.pop(id(conn), None)
+
+def _checkout_conn():
+    """
+    Takes a connection from the pool, recycling any that are closed or have been idle too long.
+    """
+    conn = init_db_pool().getconn()
+    while conn.closed or time.monotonic() - db_conn_last_used.get(id(conn), time.monotonic()) > DB_CONN_MAX_IDLE_SECONDS:
+        _forget_conn(conn)
+        db_pool.putconn(conn, close=True)
+        conn = db_pool.getconn()
+    return conn
+
+def execute_prepared(cur, name, params):
+    """
+    Runs the named statement from PREPARED_STATEMENTS, preparing it on this connection first
+    if it hasn't been used there yet. Only the statements a connection actually runs are prepared.
+    """
+    conn = cur.connection
+    prepared = db_prepared_conns.setdefault(id(conn), set())
+    if name not in prepared:
+        try:
+            cur.execute(f"PREPARE {name} {PREPARED_STATEMENTS[name]}")
+        except Exception:
+            # Its prepared state is unknown now, so the connection must not go back into the pool
+            conn.close()
+            raise
+        prepared.add(name)
+    cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+@contextmanager
+def db_cursor(readonly=False):
+    """
+    Yields a cursor on a pooled connection. Commits when the block finishes, rolls back if it
+    raises, and always returns the connection to the pool.
+    readonly blocks run in autocommit mode, so a plain read skips the BEGIN/COMMIT round trips.
+    """
+    conn = _checkout_conn()
+    try:
+        if readonly:
+            conn.autocommit = True
+        with conn.cursor() as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        if not conn.closed:
+            conn.autocommit = False
+            db_conn_last_used[id(conn)] = time.monotonic()
+        db_pool.putconn(conn)
+        # The pool closes surplus idle connections when they are returned
+        if conn.closed:
+            _forget_conn(conn)
 
 # --- Season Calculation (FIXED SCHEDULE) ---
 # The master schedule is now a fixed constant and will not be changed.
-SEASON_START_DATE = datetime(2025, 10, 9, 0, 0, 0, tzinfo=pytz.timezone('America/Los_Angeles'))
+LA_TZ = pytz.timezone('America/Los_Angeles')
+# pytz zones must be attached with localize(); tzinfo= would pin the zone's LMT offset
+SEASON_START_DATE = LA_TZ.localize(datetime(2025, 10, 9, 0, 0, 0))
+SEASON_LENGTH_DAYS = 14
+# Seasons are a fixed grid of whole LA calendar days, so they are computed on date ordinals
+SEASON_START_ORDINAL = SEASON_START_DATE.date().toordinal()
 # This dictionary will store the timestamp of the last manual reset for each channel.
+# It mirrors the channel_resets table so a reset survives restarts.
 # Format: {"channel_id": datetime_object}
 manual_reset_timestamps = {}
+# The season only changes every 14 days, so the computed ID is reused until it expires.
+SEASON_CACHE_TTL_SECONDS = 3600
+_season_cache = {"id": None, "expires": 0}
+
+def get_season_start(local_date):
+    """
+    Returns the start date of the season containing the given LA calendar date.
+    """
+    seasons_passed = (local_date.toordinal() - SEASON_START_ORDINAL) // SEASON_LENGTH_DAYS
+    return date.fromordinal(SEASON_START_ORDINAL + seasons_passed * SEASON_LENGTH_DAYS)
 
 def get_current_season_id():
     """
     Calculates the start date of the current season based on the FIXED anchor date.
     """
-    now = datetime.now(pytz.timezone('America/Los_Angeles'))
-    delta_days = (now - SEASON_START_DATE).days
-    seasons_passed = delta_days // 14
-    current_season_start = SEASON_START_DATE + timedelta(days=(seasons_passed * 14))
-    return current_season_start.strftime('%Y-%m-%d')
+    now_ts = time.time()
+    if now_ts < _season_cache["expires"]:
+        return _season_cache["id"]
+
+    current_season_start = get_season_start(datetime.now(LA_TZ).date())
+    next_season_start = current_season_start + timedelta(days=SEASON_LENGTH_DAYS)
+    # The next season begins at local midnight, whatever the DST offset is on that day
+    next_season_start_ts = LA_TZ.localize(datetime.combine(next_season_start, datetime.min.time())).timestamp()
+
+    _season_cache["id"] = current_season_start.isoformat()
+    # Never let a cached ID outlive the season it belongs to
+    _season_cache["expires"] = min(now_ts + SEASON_CACHE_TTL_SECONDS, next_season_start_ts)
+    return _season_cache["id"]
 
 
 # --- Reusable Season Logic ---
+def post_season_winner(channel_id, winner_id, winner_score, is_manual_reset=False):
+    """
+    Posts the end-of-season (or manual reset) announcement for a channel.
+    winner_id is None when no valid spots were recorded in the period.
+    """
+    if is_manual_reset:
+        announcement = "✅ *Manual Reset Complete!*\n\n"
+    else:
+        announcement = f"🏆 A new Spotting Season has begun! 📸\n\n"
+
+    if winner_id is not None:
+        winner_name = get_user_name(winner_id)
+        period = "interim season" if is_manual_reset else "last season"
+        announcement += f"Congratulations to *{winner_name}* for winning the {period} with {int(winner_score)} spots!"
+    else:
+        announcement += "No spots were recorded in the last period. A fresh start!"
+
+    try:
+        SLACK_PACER.wait()
+        slack_call(app.client.chat_postMessage, channel=channel_id, text=announcement)
+    except Exception as e:
+        log.error("🔴 Error posting season announcement to %s: %s", channel_id, e)
+
 def announce_season_winner(season_id_to_process, channel_id, is_manual_reset=False):
     """
     A helper function to find the winner for a given season and post announcements.
-    Can be used by both scheduled jobs and manual resets.
+    Used by manual resets; the scheduled job finds every channel's winner in one query.
     """
-    print(f"--- Announcing winner for season: {season_id_to_process} in channel {channel_id} ---")
-    conn = None
-    cur = None
+    log.info("--- Announcing winner for season: %s in channel %s ---", season_id_to_process, channel_id)
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
         winner_query = """
             SELECT spotter_id, SUM(spotter_points) AS total_score
             FROM spots
@@ -66,31 +332,15 @@ def announce_season_winner(season_id_to_process, channel_id, is_manual_reset=Fal
             ORDER BY total_score DESC
             LIMIT 1;
         """
-        cur.execute(winner_query, (season_id_to_process, channel_id))
-        winner_result = cur.fetchone()
-
-        if is_manual_reset:
-            announcement = "✅ *Manual Reset Complete!*\n\n"
-        else:
-            announcement = f"🏆 A new Spotting Season has begun! 📸\n\n"
+        with db_cursor(readonly=True) as cur:
+            cur.execute(winner_query, (season_id_to_process, channel_id))
+            winner_result = cur.fetchone()
 
-        if winner_result:
-            winner_id, winner_score = winner_result
-            winner_name = get_user_name(winner_id)
-            period = "interim season" if is_manual_reset else "last season"
-            announcement += f"Congratulations to *{winner_name}* for winning the {period} with {int(winner_score)} spots!"
-        else:
-            announcement += "No spots were recorded in the last period. A fresh start!"
-
-        app.client.chat_postMessage(channel=channel_id, text=announcement)
+        winner_id, winner_score = winner_result if winner_result else (None, None)
+        post_season_winner(channel_id, winner_id, winner_score, is_manual_reset)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in announce_season_winner: {error}")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
+        log.error("🔴 Error in announce_season_winner: %s", error)
 
 
 # --- Scheduled Job Functions ---
@@ -98,105 +348,113 @@ def daily_bonus_job():
     """
     Selects two random users per active channel to be bonus targets for the day.
     """
-    print("--- Running Daily Bonus Job ---")
+    log.info("--- Running Daily Bonus Job ---")
     global daily_bonus_users
-    daily_bonus_users.clear() # Clear previous day's targets globally
 
-    conn = None
-    cur = None
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        cur.execute("SELECT DISTINCT channel_id FROM spots")
-        active_channels = [row[0] for row in cur.fetchall()]
-        print(f"--- Found active channels for bonus job: {active_channels} ---")
-
-        new_bonus_assignments = {} # Use a temporary dict to build the new assignments
-
-        for channel_id in active_channels:
+        with db_cursor(readonly=True) as cur:
+            # Postgres picks two random participants (anyone who has spotted or been spotted)
+            # per channel, so only the chosen IDs come back. spot_scores already holds one row per
+            # channel, season, user and role, so this never has to walk the whole spots table.
             cur.execute("""
-                SELECT DISTINCT user_id FROM (
-                    SELECT spotter_id as user_id FROM spots WHERE channel_id = %s
-                    UNION
-                    SELECT spotted_id as user_id FROM spots WHERE channel_id = %s
-                ) as participants
-            """, (channel_id, channel_id))
+                SELECT channel_id, (array_agg(user_id ORDER BY random()))[1:2], count(*)
+                FROM (
+                    SELECT DISTINCT channel_id, user_id
+                    FROM spot_scores
+                    WHERE score > 0
+                ) AS participants
+                GROUP BY channel_id
+            """)
+            channel_picks = cur.fetchall()
+        log.info("--- Found active channels for bonus job: %s ---", [row[0] for row in channel_picks])
 
-            participants = [row[0] for row in cur.fetchall()]
-            print(f"--- Found participants for channel {channel_id}: {participants} ---")
+        new_bonus_assignments = {} # Use a temporary dict to build the new assignments
 
+        for channel_id, bonus_targets, participant_count in channel_picks:
+            log.info("--- Found %s participants for channel %s ---", participant_count, channel_id)
 
-            if len(participants) >= 2:
-                bonus_targets = random.sample(participants, 2)
+            if participant_count >= 2:
                 # Store in the temporary dictionary
-                new_bonus_assignments[channel_id] = set(bonus_targets)
+                new_bonus_assignments[channel_id] = frozenset(bonus_targets)
 
                 user1_name = get_user_name(bonus_targets[0])
                 user2_name = get_user_name(bonus_targets[1])
                 announcement = f"🎉 *Daily Bonus!* 🎉\nToday's bonus targets are *{user1_name}* and *{user2_name}*! Spots of them are worth 2 points!"
                 try:
-                    app.client.chat_postMessage(channel=channel_id, text=announcement)
-                    print(f"--- Bonus users announced for channel {channel_id}: {bonus_targets} ---")
+                    SLACK_PACER.wait()
+                    slack_call(app.client.chat_postMessage, channel=channel_id, text=announcement)
+                    log.info("--- Bonus users announced for channel %s: %s ---", channel_id, bonus_targets)
                 except Exception as api_error:
-                    print(f"🔴 Error posting bonus announcement to {channel_id}: {api_error}")
+                    log.error("🔴 Error posting bonus announcement to %s: %s", channel_id, api_error)
             else:
-                 print(f"--- Not enough participants in channel {channel_id} to assign bonus targets. ---")
+                 log.info("--- Not enough participants in channel %s to assign bonus targets. ---", channel_id)
 
-        # Atomically update the global variable
+        # Atomically swap in the new snapshot; handlers keep reading the old one until then
         daily_bonus_users = new_bonus_assignments
-        print("--- Daily Bonus Job Finished ---")
+        log.info("--- Daily Bonus Job Finished ---")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in daily_bonus_job: {error}")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
+        log.error("🔴 Error in daily_bonus_job: %s", error)
 
 
 def end_of_season_job():
     """
     Scheduled job that runs automatically. It determines the previous season and announces the winner.
     """
-    print("--- Running Scheduled End of Season Job ---")
+    log.info("--- Running Scheduled End of Season Job ---")
     global manual_reset_timestamps
 
-    current_season_start_str = get_current_season_id()
-    current_season_start_dt = datetime.strptime(current_season_start_str, '%Y-%m-%d').astimezone(pytz.timezone('America/Los_Angeles'))
-    previous_season_start_dt = current_season_start_dt - timedelta(days=14)
-    previous_season_id = previous_season_start_dt.strftime('%Y-%m-%d')
+    # Worked out on LA calendar dates; the server's own timezone must not shift the season ID
+    current_season_start = get_season_start(datetime.now(LA_TZ).date())
+    previous_season_id = (current_season_start - timedelta(days=SEASON_LENGTH_DAYS)).isoformat()
 
-    conn = None
-    cur = None
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT channel_id FROM spots WHERE season_id = %s", (previous_season_id,))
-        channels = [row[0] for row in cur.fetchall()]
-        cur.close() # Close cursor after fetching channels
-        conn.close() # Close connection after fetching channels
-
-        for channel_id in channels:
-            # Reconnect or pass connection details if needed by announce_season_winner
-            announce_season_winner(previous_season_id, channel_id, is_manual_reset=False)
+        # Every channel that had spots last season, with its top spotter, in one query.
+        # Channels whose spots were all invalidated come back with a NULL winner.
+        winners_query = """
+            SELECT DISTINCT ON (channel_id) channel_id, spotter_id, total_score
+            FROM (
+                SELECT channel_id, spotter_id, SUM(spotter_points) FILTER (WHERE is_valid) AS total_score
+                FROM spots
+                WHERE season_id = %s
+                GROUP BY channel_id, spotter_id
+            ) AS season_totals
+            ORDER BY channel_id, total_score DESC NULLS LAST;
+        """
+        with db_cursor(readonly=True) as cur:
+            cur.execute(winners_query, (previous_season_id,))
+            channel_winners = cur.fetchall()
+        log.info("--- Announcing winners for season %s in %s channels ---", previous_season_id, len(channel_winners))
+
+        # Posted one by one on the scheduler thread; SLACK_PACER keeps them to one per second, and
+        # SLACK_IO stays free for the interactive calls
+        for channel_id, winner_id, winner_score in channel_winners:
+            post_season_winner(channel_id, winner_id if winner_score is not None else None, winner_score)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error getting channels in end_of_season_job: {error}")
-    finally:
-        if cur is not None and not cur.closed:
-             cur.close()
-        if conn is not None and not conn.closed:
-             conn.close()
+        log.error("🔴 Error getting channels in end_of_season_job: %s", error)
 
 
     # Clear all manual resets for the new season
+    try:
+        with db_cursor() as cur:
+            cur.execute("DELETE FROM channel_resets")
+    except (Exception, psycopg2.DatabaseError) as error:
+        log.error("🔴 Error clearing channel_resets: %s", error)
     manual_reset_timestamps.clear()
-    print("--- Manual reset timestamps cleared for the new season. ---")
-    print("--- Scheduled End of Season Job Finished ---")
+    log.info("--- Manual reset timestamps cleared for the new season. ---")
+    log.info("--- Scheduled End of Season Job Finished ---")
+
+
+def midnight_jobs():
+    """
+    Runs the jobs that are due at LA midnight from a single scheduler trigger.
+    The season ends on every SEASON_LENGTH_DAYS boundary counted from SEASON_START_DATE.
+    """
+    today = datetime.now(LA_TZ).date()
+    if (today.toordinal() - SEASON_START_ORDINAL) % SEASON_LENGTH_DAYS == 0:
+        end_of_season_job()
+    daily_bonus_job()
 
 
 # --- Database Setup & Other Listeners ---
@@ -221,6 +479,69 @@ def setup_database():
         UNIQUE (message_ts, spotted_id)
     );
     """
+    # Partial covering indexes so the seasonal and all-time leaderboards can be answered
+    # from the index alone instead of scanning the whole spots table.
+    spots_index_commands = [
+        "CREATE INDEX IF NOT EXISTS spots_chan_season_spotter ON spots (channel_id, season_id, spotter_id) INCLUDE (spotter_points, created_at) WHERE is_valid;",
+        "CREATE INDEX IF NOT EXISTS spots_chan_season_spotted ON spots (channel_id, season_id, spotted_id) INCLUDE (caught_points, created_at) WHERE is_valid;",
+        # mystats: a user's spots made and most-spotted target, read from the index alone
+        "CREATE INDEX IF NOT EXISTS spots_chan_spotter_targets ON spots (channel_id, spotter_id, spotted_id) INCLUDE (spotter_points) WHERE is_valid;",
+        # Also serves the miss you / explode picture lookups, which match on channel_id and spotted_id
+        "CREATE INDEX IF NOT EXISTS spots_chan_spotted_alltime ON spots (channel_id, spotted_id) INCLUDE (caught_points) WHERE is_valid;",
+    ]
+    # Running per-season totals, kept in step with spots by a trigger so leaderboards
+    # don't have to re-aggregate every spot ever recorded. role is 'spot' or 'caught'.
+    spot_scores_table_command = """
+    CREATE TABLE IF NOT EXISTS spot_scores (
+        channel_id TEXT NOT NULL,
+        season_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        score INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (channel_id, season_id, user_id, role)
+    );
+    CREATE INDEX IF NOT EXISTS spot_scores_board ON spot_scores (channel_id, role, season_id, score DESC);
+    """
+    # Fills spot_scores from existing spots the first time it is created
+    spot_scores_backfill_command = """
+    INSERT INTO spot_scores (channel_id, season_id, user_id, role, score)
+    SELECT * FROM (
+        SELECT channel_id, season_id, spotter_id, 'spot', SUM(spotter_points) FROM spots WHERE is_valid GROUP BY channel_id, season_id, spotter_id
+        UNION ALL
+        SELECT channel_id, season_id, spotted_id, 'caught', SUM(caught_points) FROM spots WHERE is_valid GROUP BY channel_id, season_id, spotted_id
+    ) AS totals
+    WHERE NOT EXISTS (SELECT 1 FROM spot_scores);
+    """
+    spot_scores_trigger_command = """
+    CREATE OR REPLACE FUNCTION spot_scores_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_valid THEN
+            UPDATE spot_scores SET score = score - OLD.spotter_points
+            WHERE channel_id = OLD.channel_id AND season_id = OLD.season_id AND user_id = OLD.spotter_id AND role = 'spot';
+            UPDATE spot_scores SET score = score - OLD.caught_points
+            WHERE channel_id = OLD.channel_id AND season_id = OLD.season_id AND user_id = OLD.spotted_id AND role = 'caught';
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_valid THEN
+            INSERT INTO spot_scores (channel_id, season_id, user_id, role, score)
+            VALUES (NEW.channel_id, NEW.season_id, NEW.spotter_id, 'spot', NEW.spotter_points),
+                   (NEW.channel_id, NEW.season_id, NEW.spotted_id, 'caught', NEW.caught_points)
+            ON CONFLICT (channel_id, season_id, user_id, role) DO UPDATE SET score = spot_scores.score + EXCLUDED.score;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    DROP TRIGGER IF EXISTS spots_update_scores ON spots;
+    CREATE TRIGGER spots_update_scores AFTER INSERT OR UPDATE OR DELETE ON spots
+        FOR EACH ROW EXECUTE FUNCTION spot_scores_apply();
+    """
+    # Manual resets, so they survive a restart. Only rows for the current season_id apply.
+    channel_resets_table_command = """
+    CREATE TABLE IF NOT EXISTS channel_resets (
+        channel_id TEXT PRIMARY KEY,
+        season_id TEXT NOT NULL,
+        reset_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """
     assassin_players_table_command = """
     CREATE TABLE IF NOT EXISTS assassin_players (
         id SERIAL PRIMARY KEY,
@@ -241,380 +562,449 @@ def setup_database():
         created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
     );
     """
-    conn = None
-    cur = None
+    # Most assassin queries only look at the players still alive in one channel.
+    # Built inline at startup rather than CONCURRENTLY, which can't run inside a transaction;
+    # these tables only ever hold a game's worth of rows.
+    assassin_index_commands = [
+        "CREATE INDEX IF NOT EXISTS assassin_players_active ON assassin_players (channel_id) INCLUDE (player_id, target_id, kill_count) WHERE is_active;",
+        "CREATE INDEX IF NOT EXISTS assassin_eliminations_chan_created ON assassin_eliminations (channel_id, created_at DESC);",
+        # Eliminations look players up by ID whether or not they are still alive
+        "CREATE INDEX IF NOT EXISTS assassin_players_chan_player ON assassin_players (channel_id, player_id);",
+        # The dead list joins each eliminated player to the elimination that took them out
+        "CREATE INDEX IF NOT EXISTS assassin_eliminations_chan_victim ON assassin_eliminations (channel_id, victim_id) INCLUDE (killer_id, created_at);",
+    ]
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        if not db_url:
-            print("🔴 DATABASE_URL is not set. Please check your .env file.")
-            return
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-        cur.execute(spots_table_command)
-        cur.execute(assassin_players_table_command)
-        cur.execute(assassin_eliminations_table_command)
-        conn.commit()
-        print("✅ All database tables are ready.")
+        init_db_pool()
+        with db_cursor() as cur:
+            cur.execute(spots_table_command)
+            for index_command in spots_index_commands:
+                cur.execute(index_command)
+            cur.execute(spot_scores_table_command)
+            cur.execute(spot_scores_backfill_command)
+            cur.execute(spot_scores_trigger_command)
+            cur.execute(channel_resets_table_command)
+            cur.execute(assassin_players_table_command)
+            cur.execute(assassin_eliminations_table_command)
+            for index_command in assassin_index_commands:
+                cur.execute(index_command)
+        log.info("✅ All database tables are ready.")
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error while connecting to PostgreSQL: {error}")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
+        log.error("🔴 Error while connecting to PostgreSQL: %s", error)
+
+def load_spot_message_timestamps():
+    """
+    Loads the timestamps of every message that has spot rows, for handle_message_deletion.
+    """
+    global spot_message_timestamps
+    try:
+        with db_cursor(readonly=True) as cur:
+            cur.execute("SELECT DISTINCT message_ts FROM spots")
+            spot_message_timestamps = {row[0] for row in cur}
+        log.info("--- Tracking %s spot messages for deletions ---", len(spot_message_timestamps))
+    except (Exception, psycopg2.DatabaseError) as error:
+        log.error("🔴 Error loading spot message timestamps: %s", error)
+
+def load_manual_resets():
+    """
+    Loads this season's manual resets from channel_resets into manual_reset_timestamps.
+    """
+    try:
+        with db_cursor(readonly=True) as cur:
+            cur.execute("SELECT channel_id, reset_at FROM channel_resets WHERE season_id = %s", (get_current_season_id(),))
+            manual_reset_timestamps.update(cur.fetchall())
+        log.info("--- Loaded manual resets for %s channels ---", len(manual_reset_timestamps))
+    except (Exception, psycopg2.DatabaseError) as error:
+        log.error("🔴 Error loading manual resets: %s", error)
+
+def _cache_user_name(user_id, user_name, ttl_seconds):
+    with user_cache_lock:
+        user_cache[user_id] = (user_name, time.time() + ttl_seconds)
+        user_cache.move_to_end(user_id)
+        while len(user_cache) > USER_CACHE_MAX_SIZE:
+            user_cache.popitem(last=False)
+
+def _display_name(user):
+    return user['profile'].get('real_name', user['profile'].get('display_name', user['name']))
 
 def get_user_name(user_id):
-    if user_id in user_cache:
-        return user_cache[user_id]
+    with user_cache_lock:
+        cached = user_cache.get(user_id)
+        if cached and time.time() < cached[1]:
+            user_cache.move_to_end(user_id)
+            return cached[0]
     try:
-        result = app.client.users_info(user=user_id)
-        user_name = result['user']['profile'].get('real_name', result['user']['profile'].get('display_name', result['user']['name']))
-        user_cache[user_id] = user_name
+        result = slack_call(app.client.users_info, user=user_id)
+        user_name = _display_name(result['user'])
+        _cache_user_name(user_id, user_name, USER_CACHE_TTL_SECONDS)
         return user_name
     except Exception as e:
-        print(f"Error fetching user info for {user_id}: {e}")
-        return f"User ({user_id})"
+        log.warning("Error fetching user info for %s: %s", user_id, e)
+        fallback_name = f"User ({user_id})"
+        # Remember the failure briefly so repeated renders don't keep hitting the API
+        _cache_user_name(user_id, fallback_name, USER_CACHE_NEGATIVE_TTL_SECONDS)
+        return fallback_name
+
+def warm_user_cache():
+    """
+    Loads every workspace member's name with paginated users.list calls, so most
+    lookups never need a users.info request. If the workspace has more members than
+    the cache holds, only the names already cached are refreshed, so the warm never
+    evicts the users the bot is actually talking about.
+    """
+    log.info("--- Warming user name cache ---")
+    try:
+        members = []
+        cursor = None
+        while True:
+            # users.list is a low rate-limit tier, so each page waits out a 429 instead of aborting the warm
+            page = slack_call(app.client.users_list, limit=200, cursor=cursor)
+            members.extend(page['members'])
+            cursor = (page.get('response_metadata') or {}).get('next_cursor')
+            if not cursor:
+                break
+
+        if len(members) <= USER_CACHE_MAX_SIZE:
+            for member in members:
+                _cache_user_name(member['id'], _display_name(member), USER_CACHE_TTL_SECONDS)
+            log.info("--- Cached names for %s users ---", len(members))
+        else:
+            expires_at = time.time() + USER_CACHE_TTL_SECONDS
+            refreshed_count = 0
+            with user_cache_lock:
+                for member in members:
+                    if member['id'] in user_cache:
+                        # Updating an existing key leaves its place in the LRU order alone
+                        user_cache[member['id']] = (_display_name(member), expires_at)
+                        refreshed_count += 1
+            log.info("--- %s members is more than the cache holds; refreshed %s cached names ---", len(members), refreshed_count)
+    except Exception as e:
+        log.error("🔴 Error warming user name cache: %s", e)
+
+class Pacer:
+    """
+    Spaces calls out to at most `rate_per_second`, sleeping the caller until its turn.
+    Shared between threads, so concurrent callers queue up instead of bursting.
+    """
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+# Announcement jobs post to many channels in a row; Slack allows roughly one message per second
+SLACK_PACER = Pacer(1.0)
+
+def _run_slack_call(api_method, kwargs):
+    try:
+        slack_call(api_method, **kwargs)
+    except Exception as e:
+        log.error("🔴 Error in background Slack call %s: %s", api_method.__name__, e)
+
+def slack_call_in_background(api_method, **kwargs):
+    """
+    Runs a Slack API call on the SLACK_IO pool without waiting for it. Errors are logged, not raised.
+    """
+    return SLACK_IO.submit(_run_slack_call, api_method, kwargs)
+
+def resolve_user_names(user_ids):
+    """
+    Looks up several user names at once, fetching any uncached ones from Slack in parallel.
+    Returns a dict of {user_id: name}.
+    """
+    user_names = {}
+    now = time.time()
+    with user_cache_lock:
+        for user_id in dict.fromkeys(user_ids):
+            cached = user_cache.get(user_id)
+            if cached and now < cached[1]:
+                user_cache.move_to_end(user_id)
+                user_names[user_id] = cached[0]
+            else:
+                user_names[user_id] = None
+
+    missing_ids = [user_id for user_id, name in user_names.items() if name is None]
+    if len(missing_ids) == 1:
+        user_names[missing_ids[0]] = get_user_name(missing_ids[0])
+    elif missing_ids:
+        user_names.update(zip(missing_ids, USER_LOOKUP_POOL.map(get_user_name, missing_ids)))
+    return user_names
 
 # ... (Existing Spot Bot listeners: is_spot_message_and_not_command, handle_spot_message, handle_message_deletion)
 
 def is_spot_message_and_not_command(message):
+    # A spot needs a picture, so plain text (including board commands like "all time spot board")
+    # is left for the other listeners without looking at the text at all
+    if not message.get("files"):
+        return False
     text = message.get("text", "")
-    has_keyword = re.search(r"\b(spot|spotted)\b", text, re.IGNORECASE)
-    is_command = text.strip().startswith(f"<@{BOT_USER_ID}>")
+    # Cheap substring check first; most messages never mention a spot at all
+    if "spot" not in text.lower():
+        return False
+    has_keyword = SPOT_RE.search(text) is not None
+    is_command = text.lstrip().startswith(BOT_MENTION_PREFIX)
     return has_keyword and not is_command
 
 @app.message(matchers=[is_spot_message_and_not_command])
 def handle_spot_message(message, say):
     # ... (code is unchanged) ...
-    print("\n--- DEBUG: `handle_spot_message` was triggered. ---")
+    log.debug("--- `handle_spot_message` was triggered. ---")
 
-    if 'user' not in message or 'files' not in message or 'text' not in message:
+    if 'user' not in message or 'text' not in message:
+        return
+
+    # A spot needs an actual picture; Slack can send an empty files list (e.g. a removed upload)
+    files = message.get('files') or []
+    if not files:
+        return
+    image_url = files[0].get('url_private')
+    if not image_url:
         return
 
     spotter_id = message['user']
     text = message['text']
     channel_id = message['channel']
 
-    mentioned_users = set(re.findall(r"<@(\w+)>", text))
+    # Deduplicated at collection time; spotting yourself doesn't count
+    mentioned_users = {match.group(1) for match in MENTION_RE.finditer(text) if match.group(1) != spotter_id}
     if not mentioned_users:
         return
 
-    successful_spots = 0
-    conn = None
-    cur = None
-    try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        for spotted_id in mentioned_users:
-            if spotter_id == spotted_id:
-                continue
-
-            spotter_points_to_award = 1
-            # Check the global dict for bonus points
-            if channel_id in daily_bonus_users and spotted_id in daily_bonus_users.get(channel_id, set()):
-                spotter_points_to_award = 2
-                print(f"--- DEBUG: Awarding 2 bonus points for spotting {spotted_id} in {channel_id}. ---")
-
-            insert_command = """
-            INSERT INTO spots (spotter_id, spotted_id, channel_id, message_ts, image_url, season_id, spotter_points, caught_points)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-            """
-
-            spot_data = (
-                spotter_id,
-                spotted_id,
-                channel_id,
-                message['ts'],
-                message['files'][0]['url_private'],
-                get_current_season_id(),
-                spotter_points_to_award,
-                1 # caught_points is always 1
-            )
+    season_id = get_current_season_id()
+    # Today's bonus targets for this channel, read once from the current snapshot
+    bonus_targets = daily_bonus_users.get(channel_id, frozenset())
+    spot_rows = []
+    for spotted_id in mentioned_users:
+        spotter_points_to_award = 1
+        if spotted_id in bonus_targets:
+            spotter_points_to_award = 2
+            log.debug("--- Awarding 2 bonus points for spotting %s in %s. ---", spotted_id, channel_id)
 
-            cur.execute(insert_command, spot_data)
-            successful_spots += 1
+        # caught_points is always 1
+        spot_rows.append((spotter_id, spotted_id, channel_id, message['ts'], image_url, season_id, spotter_points_to_award, 1))
 
-        conn.commit()
+    successful_spots = 0
+    try:
+        # All spots from one message go in as a single multi-row INSERT.
+        # A redelivered event hits the (message_ts, spotted_id) constraint and is skipped, not raised.
+        insert_command = """
+        INSERT INTO spots (spotter_id, spotted_id, channel_id, message_ts, image_url, season_id, spotter_points, caught_points)
+        VALUES %s
+        ON CONFLICT (message_ts, spotted_id) DO NOTHING
+        RETURNING 1;
+        """
+        with db_cursor() as cur:
+            if len(spot_rows) == 1:
+                # The common single-mention case reuses the prepared INSERT
+                execute_prepared(cur, "spot_insert", spot_rows[0])
+                successful_spots = cur.rowcount
+            else:
+                successful_spots = len(execute_values(cur, insert_command, spot_rows, page_size=100, fetch=True))
 
         if successful_spots > 0:
-            app.client.reactions_add(
+            if spot_message_timestamps is not None:
+                spot_message_timestamps.add(message['ts'])
+            invalidate_leaderboards(channel_id)
+            slack_call_in_background(
+                app.client.reactions_add,
                 channel=message['channel'],
                 timestamp=message['ts'],
                 name="white_check_mark"
             )
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 DEBUG: An error occurred during database operation: {error}")
-    finally:
-         if cur is not None:
-             cur.close()
-         if conn is not None:
-             conn.close()
+        log.error("🔴 An error occurred during database operation: %s", error)
 
 @app.event({"type": "message", "subtype": "message_deleted"})
 def handle_message_deletion(event):
     # ... (code is unchanged) ...
-    print("\n--- DEBUG: `handle_message_deletion` (subtype) was triggered. ---")
+    log.debug("--- `handle_message_deletion` (subtype) was triggered. ---")
 
     if 'previous_message' not in event or 'ts' not in event['previous_message']:
-        print("--- DEBUG: No previous_message or ts found in deletion event. Skipping. ---")
+        log.debug("--- No previous_message or ts found in deletion event. Skipping. ---")
         return
 
     deleted_ts = event['previous_message']['ts']
-    print(f"--- DEBUG: A message with timestamp {deleted_ts} was deleted. Checking database. ---")
+    if spot_message_timestamps is not None and deleted_ts not in spot_message_timestamps:
+        log.debug("--- Deleted message %s was not a spot. Skipping. ---", deleted_ts)
+        return
+    log.debug("--- A message with timestamp %s was deleted. Checking database. ---", deleted_ts)
 
-    conn = None
-    cur = None
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
         delete_command = "DELETE FROM spots WHERE message_ts = %s"
 
-        cur.execute(delete_command, (deleted_ts,))
+        with db_cursor() as cur:
+            cur.execute(delete_command, (deleted_ts,))
+            deleted_count = cur.rowcount
 
-        if cur.rowcount > 0:
-            print(f"--- SUCCESS: Deleted {cur.rowcount} spot record(s) with timestamp {deleted_ts}. ---")
+        if spot_message_timestamps is not None:
+            spot_message_timestamps.discard(deleted_ts)
+        if deleted_count > 0:
+            invalidate_leaderboards(event.get('channel'))
+            log.info("--- SUCCESS: Deleted %s spot record(s) with timestamp %s. ---", deleted_count, deleted_ts)
         else:
-            print(f"--- INFO: Deleted message {deleted_ts} was not a spot record. No action taken. ---")
-
-        conn.commit()
+            log.info("--- INFO: Deleted message %s was not a spot record. No action taken. ---", deleted_ts)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 DEBUG: An error occurred during message deletion handling: {error}")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
+        log.error("🔴 An error occurred during message deletion handling: %s", error)
 
 
 # --- Command Handlers and Listeners (Spot Bot) ---
 # ... (All your existing spotboard, caughtboard, miss you, etc. handlers)
 
-def handle_spotboard_command(message, say):
-    # ... (code is unchanged) ...
+def fetch_leaderboard(channel_id, board, season_id=None, limit=5):
+    """
+    Returns the top (user_id, total_score) rows for a channel's spot or caught board.
+    Without a season_id the board covers all time; seasonal boards also respect manual resets.
+    """
+    reset_at = manual_reset_timestamps.get(channel_id)
+    if season_id is not None and reset_at is not None:
+        statement = f"leaderboard_since_reset_{board}"
+        params = (channel_id, season_id, reset_at, limit)
+    elif season_id is not None:
+        statement = "leaderboard_season"
+        params = (channel_id, board, season_id, limit)
+    else:
+        statement = "leaderboard_alltime"
+        params = (channel_id, board, limit)
+
+    with db_cursor(readonly=True) as cur:
+        execute_prepared(cur, statement, params)
+        return cur.fetchall()
+
+# Rendered leaderboards are reused briefly so a burst of board checks runs one query.
+# Format: {(board, channel_id, season_id or None for all-time): (text, time.monotonic() when it expires)}
+LEADERBOARD_CACHE_TTL_SECONDS = 30
+leaderboard_cache = {}
+# Format: {channel_id: number of score changes seen}
+leaderboard_versions = {}
+leaderboard_cache_lock = threading.Lock()
+
+def get_cached_leaderboard(cache_key):
+    """
+    Returns (cached text or None, the channel's version). On a miss, the version goes back
+    to cache_leaderboard once the board is rendered.
+    """
+    with leaderboard_cache_lock:
+        version = leaderboard_versions.get(cache_key[1], 0)
+        cached = leaderboard_cache.get(cache_key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0], version
+        leaderboard_cache.pop(cache_key, None)
+        return None, version
+
+def cache_leaderboard(cache_key, leaderboard_text, version):
+    """
+    Stores a rendered board, unless the channel's scores changed while it was being rendered.
+    """
+    with leaderboard_cache_lock:
+        if leaderboard_versions.get(cache_key[1], 0) == version:
+            leaderboard_cache[cache_key] = (leaderboard_text, time.monotonic() + LEADERBOARD_CACHE_TTL_SECONDS)
+
+def invalidate_leaderboards(channel_id):
+    """
+    Drops every cached board for a channel, after its scores have changed.
+    """
+    with leaderboard_cache_lock:
+        for cache_key in [key for key in leaderboard_cache if key[1] == channel_id]:
+            del leaderboard_cache[cache_key]
+        leaderboard_versions[channel_id] = leaderboard_versions.get(channel_id, 0) + 1
+
+# Format: {(board, all_time): (title, message when the board is empty, name used in errors)}
+LEADERBOARD_TEXTS = {
+    ("spot", False): ("Spotboard", "No spots have been recorded this season since the last reset!", "spotboard"),
+    ("caught", False): ("Caughtboard", "No one has been spotted this season since the last reset!", "caughtboard"),
+    ("spot", True): ("All-time Spotboard", "No spots have ever been recorded in this channel!", "all-time spotboard"),
+    ("caught", True): ("All-time Caughtboard", "No one has ever been caught in this channel!", "all-time caughtboard"),
+}
+
+def post_leaderboard(message, say, board, all_time=False):
+    """
+    Posts the top five of a channel's spot or caught board, for this season or all time.
+    """
+    title, empty_text, board_name = LEADERBOARD_TEXTS[(board, all_time)]
     try:
         channel_id = message['channel']
-        current_season = get_current_season_id()
-
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        query = """
-            SELECT spotter_id, SUM(spotter_points) AS total_score
-            FROM spots
-            WHERE is_valid = TRUE AND season_id = %s AND channel_id = %s
-        """
-        params = [current_season, channel_id]
-
-        if channel_id in manual_reset_timestamps:
-            query += " AND created_at >= %s"
-            params.append(manual_reset_timestamps[channel_id])
-
-        query += """
-            GROUP BY spotter_id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
+        season_id = None if all_time else get_current_season_id()
+        cache_key = (board, channel_id, season_id)
+        leaderboard_text, version = get_cached_leaderboard(cache_key)
+        if leaderboard_text is not None:
+            say(leaderboard_text)
+            return
 
-        cur.execute(query, tuple(params))
-        results = cur.fetchall()
-        cur.close()
-        conn.close()
+        results = fetch_leaderboard(channel_id, board, season_id)
 
         if not results:
-            say("No spots have been recorded this season since the last reset!")
+            say(empty_text)
             return
 
-        leaderboard_text = f"*Spotboard:*\n\n"
-        for i, row in enumerate(results):
-            user_id, score = row; score = int(score); user_name = get_user_name(user_id)
-            leaderboard_text += f"{i+1}. {user_name} - {score}\n"
+        user_names = resolve_user_names([row[0] for row in results])
+        leaderboard_text = f"*{title}:*\n\n" + "".join(
+            f"{i+1}. {user_names[user_id]} - {int(score)}\n" for i, (user_id, score) in enumerate(results)
+        )
+        cache_leaderboard(cache_key, leaderboard_text, version)
 
         say(leaderboard_text)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling spotboard command: {error}")
-        say("Sorry, I had trouble fetching the spotboard.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
+        log.error("🔴 Error handling %s command: %s", board_name, error)
+        say(f"Sorry, I had trouble fetching the {board_name}.")
 
+def handle_spotboard_command(message, say):
+    post_leaderboard(message, say, "spot")
 
 def handle_caughtboard_command(message, say):
-    # ... (code is unchanged) ...
-    try:
-        channel_id = message['channel']
-        current_season = get_current_season_id()
-
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        query = """
-            SELECT spotted_id, SUM(caught_points) AS total_score
-            FROM spots
-            WHERE is_valid = TRUE AND season_id = %s AND channel_id = %s
-        """
-        params = [current_season, channel_id]
-
-        if channel_id in manual_reset_timestamps:
-            query += " AND created_at >= %s"
-            params.append(manual_reset_timestamps[channel_id])
-
-        query += """
-            GROUP BY spotted_id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
-
-        cur.execute(query, tuple(params))
-        results = cur.fetchall()
-        cur.close()
-        conn.close()
-
-        if not results:
-            say("No one has been spotted this season since the last reset!")
-            return
-
-        leaderboard_text = f"*Caughtboard:*\n\n"
-        for i, row in enumerate(results):
-            user_id, score = row; score = int(score); user_name = get_user_name(user_id)
-            leaderboard_text += f"{i+1}. {user_name} - {score}\n"
-
-        say(leaderboard_text)
-
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling caughtboard command: {error}")
-        say("Sorry, I had trouble fetching the caughtboard.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
+    post_leaderboard(message, say, "caught")
 
 def handle_alltime_spotboard_command(message, say):
-    # ... (code is unchanged) ...
-    try:
-        channel_id = message['channel']
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-        query = """
-            SELECT spotter_id, SUM(spotter_points) AS total_score
-            FROM spots
-            WHERE is_valid = TRUE AND channel_id = %s
-            GROUP BY spotter_id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
-        cur.execute(query, (channel_id,))
-        results = cur.fetchall()
-        cur.close()
-        conn.close()
-        if not results:
-            say("No spots have ever been recorded in this channel!")
-            return
-        leaderboard_text = f"*All-time Spotboard:*\n\n"
-        for i, row in enumerate(results):
-            user_id, score = row; score = int(score); user_name = get_user_name(user_id)
-            leaderboard_text += f"{i+1}. {user_name} - {score}\n"
-        say(leaderboard_text)
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling all-time spotboard command: {error}")
-        say("Sorry, I had trouble fetching the all-time spotboard.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
+    post_leaderboard(message, say, "spot", all_time=True)
 
 def handle_alltime_caughtboard_command(message, say):
-    # ... (code is unchanged) ...
-    try:
-        channel_id = message['channel']
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-        query = """
-            SELECT spotted_id, SUM(caught_points) AS total_score
-            FROM spots
-            WHERE is_valid = TRUE AND channel_id = %s
-            GROUP BY spotted_id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
-        cur.execute(query, (channel_id,))
-        results = cur.fetchall()
-        cur.close()
-        conn.close()
-        if not results:
-            say("No one has ever been caught in this channel!")
-            return
-        leaderboard_text = f"*All-time Caughtboard:*\n\n"
-        for i, row in enumerate(results):
-            user_id, score = row; score = int(score); user_name = get_user_name(user_id)
-            leaderboard_text += f"{i+1}. {user_name} - {score}\n"
-        say(leaderboard_text)
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling all-time caughtboard command: {error}")
-        say("Sorry, I had trouble fetching the all-time caughtboard.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
+    post_leaderboard(message, say, "caught", all_time=True)
+
+def fetch_random_spot_image(spotted_id, channel_id):
+    """
+    Returns the image URL of a random valid spot of a user in a channel, or None if there are none.
+    Postgres picks the row (see the spot_picture prepared statement), so only one URL comes back.
+    """
+    with db_cursor(readonly=True) as cur:
+        execute_prepared(cur, "spot_picture", (spotted_id, channel_id))
+        row = cur.fetchone()
+    return row[0] if row else None
 
 def handle_miss_you_command(message, say):
     # ... (code is unchanged) ...
     try:
         text = message.get('text', '')
-        mentioned_users = re.findall(r"<@(\w+)>", text)
+        target_match = MENTION_RE.search(text)
 
-        if not mentioned_users:
+        if not target_match:
             say("You need to tell me who you miss! Please mention a user, like `miss you @Rohan`.")
             return
 
-        target_user_id = mentioned_users[0]
+        target_user_id = target_match.group(1)
         channel_id = message['channel']
 
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        query = "SELECT image_url FROM spots WHERE spotted_id = %s AND channel_id = %s AND is_valid = TRUE"
-        cur.execute(query, (target_user_id, channel_id))
-
-        image_urls = [row[0] for row in cur.fetchall()]
+        random_image_url = fetch_random_spot_image(target_user_id, channel_id)
 
-        cur.close()
-        conn.close()
-
-        if not image_urls:
+        if random_image_url is None:
             target_user_name = get_user_name(target_user_id)
             say(f"Sorry, I couldn't find any pictures of {target_user_name} in this channel.")
             return
 
-        random_image_url = random.choice(image_urls)
         target_user_name = get_user_name(target_user_id)
 
         say(f"Missing them? Here's a memory of {target_user_name}!\n{random_image_url}")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling 'miss you' command: {error}")
+        log.error("🔴 Error handling 'miss you' command: %s", error)
         say("Sorry, I had a problem fetching that picture.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
 
 def handle_mystats_command(message, say):
     # ... (code is unchanged) ...
@@ -622,39 +1012,34 @@ def handle_mystats_command(message, say):
         user_id = message['user']
         channel_id = message['channel']
 
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        # 1. Get total spots made by the user
-        cur.execute("SELECT SUM(spotter_points) FROM spots WHERE spotter_id = %s AND channel_id = %s AND is_valid = TRUE", (user_id, channel_id))
-        spots_made = cur.fetchone()[0] or 0
-
-        # 2. Get total times the user was caught
-        cur.execute("SELECT SUM(caught_points) FROM spots WHERE spotted_id = %s AND channel_id = %s AND is_valid = TRUE", (user_id, channel_id))
-        times_caught = cur.fetchone()[0] or 0
-
-        # 3. Get the user's most frequent target
-        cur.execute("""
-            SELECT spotted_id, COUNT(*) as spot_count
-            FROM spots
-            WHERE spotter_id = %s AND channel_id = %s AND is_valid = TRUE
-            GROUP BY spotted_id
-            ORDER BY spot_count DESC
-            LIMIT 1;
-        """, (user_id, channel_id))
-        nemesis_result = cur.fetchone()
-
-        cur.close()
-        conn.close()
+        # Spots made, times caught and most frequent target in a single round trip
+        stats_query = """
+            WITH made AS (
+                SELECT COALESCE(SUM(spotter_points), 0) AS spots_made
+                FROM spots WHERE spotter_id = %(user_id)s AND channel_id = %(channel_id)s AND is_valid = TRUE
+            ), caught AS (
+                SELECT COALESCE(SUM(caught_points), 0) AS times_caught
+                FROM spots WHERE spotted_id = %(user_id)s AND channel_id = %(channel_id)s AND is_valid = TRUE
+            ), nemesis AS (
+                SELECT spotted_id, COUNT(*) AS spot_count
+                FROM spots WHERE spotter_id = %(user_id)s AND channel_id = %(channel_id)s AND is_valid = TRUE
+                GROUP BY spotted_id
+                ORDER BY spot_count DESC
+                LIMIT 1
+            )
+            SELECT made.spots_made, caught.times_caught, nemesis.spotted_id, nemesis.spot_count
+            FROM made CROSS JOIN caught LEFT JOIN nemesis ON TRUE;
+        """
+        with db_cursor(readonly=True) as cur:
+            cur.execute(stats_query, {"user_id": user_id, "channel_id": channel_id})
+            spots_made, times_caught, nemesis_id, nemesis_count = cur.fetchone()
 
         user_name = get_user_name(user_id)
         stats_text = f"📊 *{user_name}'s Spotting Record in this channel:*\n\n"
         stats_text += f"• You have spotted others *{int(spots_made)}* times.\n"
         stats_text += f"• You have been spotted *{int(times_caught)}* times.\n"
 
-        if nemesis_result:
-            nemesis_id, nemesis_count = nemesis_result
+        if nemesis_id is not None:
             nemesis_name = get_user_name(nemesis_id)
             stats_text += f"• Your most frequent target is *{nemesis_name}* ({nemesis_count} spots)."
         else:
@@ -663,95 +1048,135 @@ def handle_mystats_command(message, say):
         say(stats_text)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error handling mystats command: {error}")
+        log.error("🔴 Error handling mystats command: %s", error)
         say("Sorry, I had trouble fetching your stats.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
 
 def handle_explode_command(message, say, client):
     # ... (code is unchanged) ...
     try:
         text = message.get('text', '')
-        mentioned_users = re.findall(r"<@(\w+)>", text)
+        target_match = MENTION_RE.search(text)
 
-        if not mentioned_users:
+        if not target_match:
             say("You need to tell me who to explode! Please mention a user, like `explode @Rohan`.")
             return
 
-        target_user_id = mentioned_users[0]
+        target_user_id = target_match.group(1)
         channel_id = message['channel']
 
         # 1. Find a random image URL from the database
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-        query = "SELECT image_url FROM spots WHERE spotted_id = %s AND channel_id = %s AND is_valid = TRUE"
-        cur.execute(query, (target_user_id, channel_id))
-        image_urls = [row[0] for row in cur.fetchall()]
-        cur.close()
-        conn.close()
-
-        if not image_urls:
+        random_image_url = fetch_random_spot_image(target_user_id, channel_id)
+
+        if random_image_url is None:
             target_user_name = get_user_name(target_user_id)
             say(f"Sorry, I couldn't find any pictures of {target_user_name} to explode.")
             return
 
-        random_image_url = random.choice(image_urls)
+        # The download, Pillow work and upload happen off the Slack event thread
+        EXPLODE_WORKERS.submit(create_and_upload_explosion, random_image_url, target_user_id, channel_id, say, client)
 
-        # 2. Download the user image and select a random local explosion image
-        auth_header = {"Authorization": f"Bearer {os.environ.get('SLACK_BOT_TOKEN')}"}
-        user_image_response = requests.get(random_image_url, headers=auth_header)
-        user_image_response.raise_for_status()
+    except Exception as e:
+        log.error("🔴 Error in explode command: %s", e)
+        say("Sorry, I had trouble creating the explosion. The image might be too powerful.")
 
-        try:
-            explosion_files = [f for f in os.listdir(EXPLOSIONS_DIR) if f.lower().endswith('.png')]
-            if not explosion_files:
-                say("I couldn't find any explosion images in my folder!")
-                return
-            random_explosion_path = os.path.join(EXPLOSIONS_DIR, random.choice(explosion_files))
-        except FileNotFoundError:
-            print(f"🔴 Error: The directory '{EXPLOSIONS_DIR}' was not found.")
+# Pictures come in a handful of common sizes, so resized overlays are worth keeping.
+# At most 1024x1024 RGBA each, this caps the cache at about 64 MB.
+@functools.lru_cache(maxsize=16)
+def sized_explosion(explosion_index, size):
+    """
+    Returns explosion overlay number explosion_index resized to size. The result is shared, so never modify it.
+    """
+    return EXPLOSION_IMAGES[explosion_index].resize(size, Image.Resampling.BILINEAR)
+
+def create_and_upload_explosion(image_url, target_user_id, channel_id, say, client):
+    """
+    Downloads a spot picture, overlays a random explosion on it and uploads the result.
+    Runs on the EXPLODE_WORKERS pool.
+    """
+    try:
+        # 2. Select a random local explosion image
+        if EXPLOSION_IMAGES is None:
             say("I'm having trouble finding my explosion effects. Please check my configuration.")
             return
+        if not EXPLOSION_IMAGES:
+            say("I couldn't find any explosion images in my folder!")
+            return
+        explosion_index = random.randrange(len(EXPLOSION_IMAGES))
 
-        # 3. Process the images with Pillow
-        base_image = Image.open(io.BytesIO(user_image_response.content)).convert("RGBA")
-        explosion_image = Image.open(random_explosion_path).convert("RGBA")
+        # 3. Download the user image and process both with Pillow.
+        # Cap the picture size first; a full-resolution phone photo is far more than Slack needs
+        user_image_response = SLACK_FILES_SESSION.get(image_url, timeout=SLACK_FILES_TIMEOUT_SECONDS)
+        user_image_response.raise_for_status()
+        base_image = Image.open(io.BytesIO(user_image_response.content))
+        base_image.thumbnail((EXPLOSION_MAX_SIZE, EXPLOSION_MAX_SIZE))
+        composite_image = base_image.convert("RGBA")
 
         # Resize explosion to match the base image size
-        explosion_image = explosion_image.resize(base_image.size)
+        explosion_image = sized_explosion(explosion_index, composite_image.size)
 
-        # Composite the images
-        composite_image = Image.alpha_composite(base_image, explosion_image)
+        # Paste the explosion over the picture in place, using its own alpha as the mask
+        composite_image.paste(explosion_image, (0, 0), explosion_image)
 
-        # Save the result to a temporary in-memory file
+        # Save the result to a temporary in-memory file. It's a photo, so JPEG is far smaller
+        # and cheaper to encode than PNG, and Slack re-encodes its previews anyway.
         temp_file = io.BytesIO()
-        composite_image.save(temp_file, format='PNG')
-        temp_file.seek(0)
+        composite_image.convert("RGB").save(temp_file, format='JPEG', quality=85)
 
         # 4. Upload the new image to Slack
         target_user_name = get_user_name(target_user_id)
         client.files_upload_v2(
             channel=channel_id,
             initial_comment=f"💥 {target_user_name} has been exploded! 💥",
-            file=temp_file,
-            filename="explosion.png"
+            # Hand over the encoded bytes; given a file object the SDK would read() a second copy
+            file=temp_file.getvalue(),
+            filename="explosion.jpg"
         )
 
     except Exception as e:
-        print(f"🔴 Error in explode command: {e}")
+        log.error("🔴 Error in explode command: %s", e)
         say("Sorry, I had trouble creating the explosion. The image might be too powerful.")
-    finally: # Ensure connection is closed
-        if 'cur' in locals() and cur is not None and not cur.closed:
-             cur.close()
-        if 'conn' in locals() and conn is not None and not conn.closed:
-             conn.close()
 
 # --- Assassin Game Command Handlers ---
 
+# A channel's players only change on start, elimination and end, so the read-only commands
+# share a cached copy of the roster. Writers bump the channel's version when they commit, and a
+# read that overlapped a write doesn't store what it saw.
+# Format: {channel_id: ([(player_id, target_id, is_active, kill_count), ...] in join order, time.monotonic() when it expires)}
+ASSASSIN_ROSTER_TTL_SECONDS = 300
+# Longest player list a command will post in one message
+ASSASSIN_LIST_LIMIT = 200
+assassin_roster_cache = {}
+# Format: {channel_id: number of writes seen}
+assassin_roster_versions = {}
+assassin_roster_lock = threading.Lock()
+
+def fetch_assassin_roster(channel_id):
+    """
+    Returns every player in the channel's game, from the cache when possible.
+    """
+    with assassin_roster_lock:
+        cached = assassin_roster_cache.get(channel_id)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        version = assassin_roster_versions.get(channel_id, 0)
+
+    with db_cursor(readonly=True) as cur:
+        execute_prepared(cur, "assassin_roster", (channel_id,))
+        roster = cur.fetchall()
+
+    with assassin_roster_lock:
+        if assassin_roster_versions.get(channel_id, 0) == version:
+            assassin_roster_cache[channel_id] = (roster, time.monotonic() + ASSASSIN_ROSTER_TTL_SECONDS)
+    return roster
+
+def invalidate_assassin_roster(channel_id):
+    """
+    Drops the channel's cached roster, after its game has been written to.
+    """
+    with assassin_roster_lock:
+        assassin_roster_cache.pop(channel_id, None)
+        assassin_roster_versions[channel_id] = assassin_roster_versions.get(channel_id, 0) + 1
+
 def handle_assassin_start_command(message, say, client):
     # ... (Admin check and start logic remains the same) ...
     channel_id = message['channel']
@@ -768,95 +1193,82 @@ def handle_assassin_start_command(message, say, client):
         return
     # --- END ADMIN CHECK ---
 
-    conn = None
-    cur = None
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        # 1. Check if a game is already running in this channel
-        cur.execute("SELECT COUNT(*) FROM assassin_players WHERE channel_id = %s AND is_active = TRUE", (channel_id,))
-        active_game_count = cur.fetchone()[0]
-        if active_game_count > 0:
-            say("An Assassin game is already in progress in this channel! Use `assassin end` to stop it first.")
-            return
-
-        # 2. Gather players
-        mentioned_users = list(set(re.findall(r"<@(\w+)>", text)))
-        if len(mentioned_users) < 3:
-            say("You need at least 3 players to start a game of Assassin. Please mention everyone who is playing.")
-            return
-
-        # 3. Clear old game data for the channel and shuffle players
-        cur.execute("DELETE FROM assassin_players WHERE channel_id = %s", (channel_id,))
-        cur.execute("DELETE FROM assassin_eliminations WHERE channel_id = %s", (channel_id,))
+        with db_cursor() as cur:
+            # 1. Check if a game is already running in this channel
+            cur.execute("SELECT EXISTS (SELECT 1 FROM assassin_players WHERE channel_id = %s AND is_active = TRUE)", (channel_id,))
+            has_active_game = cur.fetchone()[0]
+            if has_active_game:
+                say("An Assassin game is already in progress in this channel! Use `assassin end` to stop it first.")
+                return
 
-        players = mentioned_users
-        random.shuffle(players)
+            # 2. Gather players
+            mentioned_users = list(set(MENTION_RE.findall(text)))
+            if len(mentioned_users) < 3:
+                say("You need at least 3 players to start a game of Assassin. Please mention everyone who is playing.")
+                return
 
-        # 4. Assign targets and insert into database
-        for i, player_id in enumerate(players):
-            target_id = players[(i + 1) % len(players)] # The next player in the shuffled list
-            cur.execute(
-                "INSERT INTO assassin_players (channel_id, player_id, target_id) VALUES (%s, %s, %s)",
-                (channel_id, player_id, target_id)
+            # 3. Clear old game data for the channel and shuffle players
+            cur.execute("""
+                WITH players AS (DELETE FROM assassin_players WHERE channel_id = %(channel_id)s)
+                DELETE FROM assassin_eliminations WHERE channel_id = %(channel_id)s;
+                """, {"channel_id": channel_id})
+
+            players = mentioned_users
+            random.shuffle(players)
+
+            # 4. Assign targets and insert into database in one round trip
+            # Each player targets the next one in the shuffled list
+            target_map = {player_id: players[(i + 1) % len(players)] for i, player_id in enumerate(players)}
+            player_rows = [(channel_id, player_id, target_id) for player_id, target_id in target_map.items()]
+            execute_values(
+                cur,
+                "INSERT INTO assassin_players (channel_id, player_id, target_id) VALUES %s",
+                player_rows,
+                page_size=100
             )
+        invalidate_assassin_roster(channel_id)
 
-        conn.commit()
-
-        # 5. Announce the game start and notify players of their targets privately via DM
+        # 5. Announce the game start and notify players of their targets privately via DM.
+        # The game is committed by now, so no connection is held while talking to Slack.
         player_names = ", ".join([f"<@{p}>" for p in players])
         say(f"A new game of Assassin has begun!\n*Players:* {player_names}\nEach player has been sent their first target via DM. Good luck!")
 
-        print(f"--- Attempting to send targets for channel {channel_id} via DM ---")
-        for player_id in players:
+        def send_first_target(player_id):
             try:
-                cur.execute("SELECT target_id FROM assassin_players WHERE player_id = %s AND channel_id = %s", (player_id, channel_id))
-                target_id_result = cur.fetchone()
-                if not target_id_result:
-                    print(f"🔴 DEBUG: Could not find target_id for player {player_id} in DB.")
-                    continue # Skip this player if DB fetch failed
-
-                target_id = target_id_result[0]
+                # The targets were just assigned above, so there's no need to read them back
+                target_id = target_map[player_id]
                 target_name = get_user_name(target_id)
-                print(f"--- DEBUG: Preparing DM for player {player_id} ({get_user_name(player_id)}) their target is {target_id} ({target_name}) ---")
+                log.debug("--- Preparing DM for player %s their target is %s (%s) ---", player_id, target_id, target_name)
 
-                client.chat_postMessage(
+                slack_call(client.chat_postMessage,
                     channel=player_id, # Send to the user directly
                     text=f"Your first Assassin target in the <#{channel_id}> channel is: *{target_name}*."
                 )
-                print(f"--- DEBUG: Successfully sent DM to {player_id} ---")
+                log.debug("--- Successfully sent DM to %s ---", player_id)
             except Exception as e:
-                print(f"🔴 DEBUG: Error sending DM to {player_id}: {e}")
+                log.error("🔴 Error sending DM to %s: %s", player_id, e)
                 starter_name = get_user_name(starter_id)
                 failed_player_name = get_user_name(player_id)
                 say(f"⚠️ {starter_name}, I couldn't send a DM to {failed_player_name}. They might need to check their app permissions or start a conversation with me first.")
 
+        # Each DM is its own conversation, so they go out side by side from the Slack I/O pool.
+        # The handler returns without waiting for them; a failed DM reports itself in the channel.
+        log.info("--- Attempting to send targets for channel %s via DM ---", channel_id)
+        for player_id in players:
+            SLACK_IO.submit(send_first_target, player_id)
+
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_start_command: {error}")
+        log.error("🔴 Error in assassin_start_command: %s", error)
         say("Sorry, I ran into an error trying to start the game.")
-    finally:
-        # Ensure connection is closed
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 def handle_assassin_target_command(message, say, client):
     # ... (code is unchanged) ...
     channel_id = message['channel']
     player_id = message['user']
 
-    conn = None
-    cur = None
     try:
-        db_url = os.environ.get("DATABASE_URL")
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
-
-        cur.execute("SELECT target_id, is_active FROM assassin_players WHERE player_id = %s AND channel_id = %s", (player_id, channel_id))
-        result = cur.fetchone()
+        result = next((row[1:3] for row in fetch_assassin_roster(channel_id) if row[0] == player_id), None)
 
         if not result:
             client.chat_postEphemeral(channel=channel_id, user=player_id, text="You are not currently in a game of Assassin in this channel.")
@@ -871,30 +1283,22 @@ def handle_assassin_target_command(message, say, client):
         client.chat_postEphemeral(channel=channel_id, user=player_id, text=f"Your current target is: *{target_name}*.")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_target_command: {error}")
+        log.error("🔴 Error in assassin_target_command: %s", error)
         client.chat_postEphemeral(channel=channel_id, user=player_id, text="Sorry, I had a problem fetching your target.")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 
 def handle_eliminated_command(message, say, client):
     # ... (code is unchanged, including the fix to ignore self-messages) ...
-    print(f"\n--- DEBUG: handle_eliminated_command triggered by message: {message.get('text', '')[:50]} ---")
-    print(f"--- DEBUG: Message user: {message.get('user')}, Bot ID: {BOT_USER_ID}, Message has bot_id: {'bot_id' in message} ---")
-
     # More robust check: Ignore messages sent by the bot itself OR any other bot
     if message.get('user') == BOT_USER_ID or message.get('bot_id') is not None:
-        print("--- DEBUG: Ignoring message from self or another bot in handle_eliminated_command ---")
         return
+    log.debug("--- handle_eliminated_command triggered by message from %s ---", message.get('user'))
 
     channel_id = message['channel']
     # Ensure 'user' exists before using it, though the check above should handle most cases
     killer_id = message.get('user')
     if not killer_id:
-        print("--- DEBUG: Message missing 'user' field in handle_eliminated_command. Skipping. ---")
+        log.debug("--- Message missing 'user' field in handle_eliminated_command. Skipping. ---")
         return # Cannot process if we don't know who sent it
 
     text = message.get('text', '')
@@ -904,28 +1308,63 @@ def handle_eliminated_command(message, say, client):
         say("An elimination attempt requires photo or video proof!")
         return
 
-    mentioned_users = re.findall(r"<@(\w+)>", text)
-    if not mentioned_users:
+    # Only the first mention matters, so stop scanning there
+    victim_match = MENTION_RE.search(text)
+    if not victim_match:
         say("You must mention the player you are eliminating.")
         return
-    victim_id = mentioned_users[0]
+    victim_id = victim_match.group(1)
 
-    conn = None # Initialize outside try
-    cur = None # Initialize outside try
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-
-        # 2. Advanced Validation
-        cur.execute("SELECT target_id, is_active FROM assassin_players WHERE player_id = %s AND channel_id = %s", (killer_id, channel_id))
-        killer_data = cur.fetchone()
-
+        with db_cursor() as cur:
+            # 2 & 3. Validate and process the elimination in a single round trip. The victim is only
+            # deactivated if the killer is active and targeting them; the killer inherits the victim's
+            # target and the elimination is logged only if that happened. Every part of the statement
+            # sees the same snapshot, so the victim is left out of the remaining players by hand.
+            # Two remaining players are enough to tell whether the game is over.
+            cur.execute("""
+                WITH killer AS (
+                    SELECT target_id, is_active FROM assassin_players
+                    WHERE player_id = %(killer_id)s AND channel_id = %(channel_id)s
+                    FOR UPDATE
+                ), eliminated AS (
+                    UPDATE assassin_players SET is_active = FALSE
+                    WHERE player_id = %(victim_id)s AND channel_id = %(channel_id)s AND is_active
+                      AND EXISTS (SELECT 1 FROM killer WHERE is_active AND target_id = %(victim_id)s)
+                    RETURNING target_id
+                ), promoted AS (
+                    UPDATE assassin_players
+                    SET target_id = (SELECT target_id FROM eliminated), kill_count = kill_count + 1
+                    WHERE player_id = %(killer_id)s AND channel_id = %(channel_id)s
+                      AND EXISTS (SELECT 1 FROM eliminated)
+                ), logged AS (
+                    INSERT INTO assassin_eliminations (channel_id, killer_id, victim_id)
+                    SELECT %(channel_id)s, %(killer_id)s, %(victim_id)s FROM eliminated
+                )
+                SELECT
+                    (SELECT target_id FROM killer),
+                    (SELECT is_active FROM killer),
+                    (SELECT target_id FROM eliminated),
+                    ARRAY(
+                        SELECT player_id FROM assassin_players
+                        WHERE channel_id = %(channel_id)s AND is_active
+                          AND NOT (player_id = %(victim_id)s AND EXISTS (SELECT 1 FROM eliminated))
+                        LIMIT 2
+                    );
+                """, {"killer_id": killer_id, "victim_id": victim_id, "channel_id": channel_id})
+            killer_target, killer_is_active, new_target_id, active_players = cur.fetchone()
+
+            # 4. Check for a winner. new_target_id is only set when the elimination went through.
+            if new_target_id is not None and len(active_players) == 1:
+                # Clear the game board - Consider just marking as inactive? For now, deleting.
+                cur.execute("DELETE FROM assassin_players WHERE channel_id = %s", (channel_id,))
+
+        # The transaction is committed and its row locks released before any reply goes to Slack
         # This check should now only run for actual user messages
-        if not killer_data:
+        if killer_is_active is None:
             say("You are not a player in the current game.")
             return
 
-        killer_target, killer_is_active = killer_data
         if not killer_is_active:
             say("You can't eliminate someone when you've already been eliminated!")
             return
@@ -934,118 +1373,89 @@ def handle_eliminated_command(message, say, client):
             say("That is not your target!")
             return
 
-        # Check if victim exists and is active
-        cur.execute("SELECT target_id, is_active FROM assassin_players WHERE player_id = %s AND channel_id = %s", (victim_id, channel_id))
-        victim_data = cur.fetchone()
-        if not victim_data or not victim_data[1]: # If victim doesn't exist or is already inactive
+        # If victim doesn't exist or is already inactive
+        if new_target_id is None:
              say("Your target has already been eliminated.")
              return
 
-        # 3. Process the elimination
-        new_target_id = victim_data[0] # Get the victim's target
-
-        # Update victim's status
-        cur.execute("UPDATE assassin_players SET is_active = FALSE WHERE player_id = %s AND channel_id = %s", (victim_id, channel_id))
-
-        # Update killer's status
-        cur.execute("UPDATE assassin_players SET target_id = %s, kill_count = kill_count + 1 WHERE player_id = %s AND channel_id = %s", (new_target_id, killer_id, channel_id))
+        invalidate_assassin_roster(channel_id)
 
-        # Log the elimination
-        cur.execute("INSERT INTO assassin_eliminations (channel_id, killer_id, victim_id) VALUES (%s, %s, %s)", (channel_id, killer_id, victim_id))
+        announced_id = active_players[0] if len(active_players) == 1 else new_target_id
 
-        conn.commit()
-
-        # 4. Check for a winner
-        cur.execute("SELECT player_id FROM assassin_players WHERE channel_id = %s AND is_active = TRUE", (channel_id,))
-        active_players = cur.fetchall()
-
-        killer_name = get_user_name(killer_id)
-        victim_name = get_user_name(victim_id)
+        def announce_elimination():
+            try:
+                user_names = resolve_user_names([killer_id, victim_id, announced_id])
+                killer_name = user_names[killer_id]
+                victim_name = user_names[victim_id]
+
+                if len(active_players) == 1:
+                    winner_name = user_names[announced_id]
+                    say(f"💥 *{killer_name}* has eliminated *{victim_name}*! 💥\n\n🏆 The game is over! Congratulations to the winner, *{winner_name}*! 🏆")
+                else:
+                    # Announce elimination and notify killer of new target
+                    say(f"💥 *{killer_name}* has eliminated *{victim_name}*! 💥")
+                    new_target_name = user_names[announced_id]
+                    client.chat_postEphemeral(
+                        channel=channel_id,
+                        user=killer_id,
+                        text=f"Congratulations on the elimination! Your new target is: *{new_target_name}*."
+                    )
+            except Exception as e:
+                log.error("🔴 Error announcing elimination in %s: %s", channel_id, e)
 
-        if len(active_players) == 1:
-            winner_id = active_players[0][0]
-            winner_name = get_user_name(winner_id)
-            say(f"💥 *{killer_name}* has eliminated *{victim_name}*! 💥\n\n🏆 The game is over! Congratulations to the winner, *{winner_name}*! 🏆")
-            # Clear the game board - Consider just marking as inactive? For now, deleting.
-            cur.execute("DELETE FROM assassin_players WHERE channel_id = %s", (channel_id,))
-            conn.commit()
-        else:
-            # Announce elimination and notify killer of new target
-            say(f"💥 *{killer_name}* has eliminated *{victim_name}*! 💥")
-            new_target_name = get_user_name(new_target_id)
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=killer_id,
-                text=f"Congratulations on the elimination! Your new target is: *{new_target_name}*."
-            )
+        # The elimination is already committed; the name lookups and posts go out from the Slack I/O pool
+        SLACK_IO.submit(announce_elimination)
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in eliminated_command: {error}")
+        log.error("🔴 Error in eliminated_command: %s", error)
         say("Sorry, I encountered an error while processing the elimination.")
-    finally:
-        # Ensure connection is closed even if errors occur before explicit close
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 
 def handle_assassin_alive_command(message, say):
     # ... (code is unchanged) ...
     channel_id = message['channel']
-    conn = None
-    cur = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-        cur.execute("SELECT player_id FROM assassin_players WHERE channel_id = %s AND is_active = TRUE ORDER BY created_at", (channel_id,))
-        active_players_ids = [row[0] for row in cur.fetchall()]
-
+        active_players_ids = [player_id for player_id, _, is_active, _ in fetch_assassin_roster(channel_id) if is_active][:ASSASSIN_LIST_LIMIT]
 
         if not active_players_ids:
             say("No game is currently active, or everyone has been eliminated!")
             return
 
-        alive_list = "\n".join([f"• {get_user_name(pid)}" for pid in active_players_ids])
+        user_names = resolve_user_names(active_players_ids)
+        alive_list = "\n".join([f"• {user_names[pid]}" for pid in active_players_ids])
         say(f"Players still alive:\n{alive_list}")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_alive_command: {error}")
+        log.error("🔴 Error in assassin_alive_command: %s", error)
         say("Sorry, I couldn't fetch the list of active players.")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 def handle_assassin_dead_command(message, say):
     # ... (code is unchanged) ...
     channel_id = message['channel']
-    conn = None
-    cur = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-        # Fetching eliminated players along with who eliminated them and when
-        cur.execute("""
-            SELECT ap.player_id, ae.killer_id, ae.created_at
-            FROM assassin_players ap
-            LEFT JOIN assassin_eliminations ae ON ap.player_id = ae.victim_id AND ap.channel_id = ae.channel_id
-            WHERE ap.channel_id = %s AND ap.is_active = FALSE
-            ORDER BY ae.created_at DESC NULLS LAST
-            """, (channel_id,))
-        eliminated_players_data = cur.fetchall()
-
+        with db_cursor(readonly=True) as cur:
+            # Fetching eliminated players along with who eliminated them and when
+            cur.execute("""
+                SELECT ap.player_id, ae.killer_id, ae.created_at
+                FROM assassin_players ap
+                LEFT JOIN assassin_eliminations ae ON ap.player_id = ae.victim_id AND ap.channel_id = ae.channel_id
+                WHERE ap.channel_id = %s AND ap.is_active = FALSE
+                ORDER BY ae.created_at DESC NULLS LAST
+                LIMIT %s
+                """, (channel_id, ASSASSIN_LIST_LIMIT))
+            eliminated_players_data = cur.fetchall()
 
         if not eliminated_players_data:
             say("No players have been eliminated yet in this game.")
             return
 
+        # Victims and killers overlap, so each name is looked up once
+        user_names = resolve_user_names([user_id for row in eliminated_players_data for user_id in row[:2] if user_id])
         dead_list_lines = []
         for victim_id, killer_id, eliminated_at in eliminated_players_data:
-            victim_name = get_user_name(victim_id)
+            victim_name = user_names[victim_id]
             if killer_id and eliminated_at:
-                 killer_name = get_user_name(killer_id)
+                 killer_name = user_names[killer_id]
                  eliminated_at_str = eliminated_at.strftime("%Y-%m-%d %H:%M")
                  dead_list_lines.append(f"• {victim_name} (eliminated by {killer_name} on {eliminated_at_str})")
             else:
@@ -1056,52 +1466,32 @@ def handle_assassin_dead_command(message, say):
         say(f"Players who have been eliminated:\n{dead_list}")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_dead_command: {error}")
+        log.error("🔴 Error in assassin_dead_command: %s", error)
         say("Sorry, I couldn't fetch the list of eliminated players.")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 def handle_assassin_killcount_command(message, say):
     # ... (code is unchanged) ...
     channel_id = message['channel']
-    conn = None
-    cur = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT player_id, kill_count
-            FROM assassin_players
-            WHERE channel_id = %s AND kill_count > 0
-            ORDER BY kill_count DESC
-            LIMIT 3
-            """, (channel_id,))
-        top_killers = cur.fetchall()
-
+        scored_players = [(player_id, kill_count) for player_id, _, _, kill_count in fetch_assassin_roster(channel_id) if kill_count > 0]
+        top_killers = sorted(scored_players, key=lambda row: row[1], reverse=True)[:3]
 
         if not top_killers:
             say("No kills have been recorded yet in this game.")
             return
 
+        user_names = resolve_user_names([row[0] for row in top_killers])
         killboard_lines = []
         for i, (player_id, kill_count) in enumerate(top_killers):
-            player_name = get_user_name(player_id)
+            player_name = user_names[player_id]
             killboard_lines.append(f"{i+1}. {player_name} - {kill_count} kills")
 
         killboard_text = "\n".join(killboard_lines)
         say(f"*Assassin Killboard (Top 3):*\n{killboard_text}")
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_killcount_command: {error}")
+        log.error("🔴 Error in assassin_killcount_command: %s", error)
         say("Sorry, I couldn't fetch the killboard.")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 def handle_assassin_end_request(message, client, say):
     # ... (Admin check added previously) ...
@@ -1118,15 +1508,12 @@ def handle_assassin_end_request(message, client, say):
         return
     # --- END ADMIN CHECK ---
 
-    conn = None
-    cur = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM assassin_players WHERE channel_id = %s AND is_active = TRUE", (channel_id,))
-        active_game_count = cur.fetchone()[0]
+        with db_cursor(readonly=True) as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM assassin_players WHERE channel_id = %s AND is_active = TRUE)", (channel_id,))
+            has_active_game = cur.fetchone()[0]
 
-        if active_game_count == 0:
+        if not has_active_game:
             say("There is no active Assassin game in this channel to end.")
             return
 
@@ -1137,14 +1524,8 @@ def handle_assassin_end_request(message, client, say):
             blocks=[{"type": "section", "text": {"type": "mrkdwn", "text": "Are you sure you want to end the current Assassin game? This will clear all game data for this channel."}}, {"type": "actions", "elements": [{"type": "button", "text": {"type": "plain_text", "text": "Confirm End Game"}, "style": "danger", "action_id": "confirm_end_assassin_action"}, {"type": "button", "text": {"type": "plain_text", "text": "Cancel"}, "action_id": "cancel_end_assassin_action"}]}]
         )
     except Exception as e:
-        print(f"🔴 Error sending end game confirmation: {e}")
+        log.error("🔴 Error sending end game confirmation: %s", e)
         say("Sorry, I couldn't process the request to end the game.")
-    finally:
-        # Ensure connection is closed even if errors occur before explicit close
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
 
 def handle_assassin_targets_command(message, client):
     """Admin command to DM the list of current targets."""
@@ -1161,41 +1542,27 @@ def handle_assassin_targets_command(message, client):
         return
     # --- END ADMIN CHECK ---
 
-    conn = None
-    cur = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT player_id, target_id
-            FROM assassin_players
-            WHERE channel_id = %s AND is_active = TRUE
-            ORDER BY created_at
-            """, (channel_id,))
-        targets = cur.fetchall()
+        targets = [(player_id, target_id) for player_id, target_id, is_active, _ in fetch_assassin_roster(channel_id) if is_active]
 
         if not targets:
-             client.chat_postMessage(channel=user_id, text=f"No active Assassin game found in <#{channel_id}>.")
+             slack_call(client.chat_postMessage, channel=user_id, text=f"No active Assassin game found in <#{channel_id}>.")
              return
 
+        # Every active player is also someone's target, so each name is looked up once
+        user_names = resolve_user_names([user_id for row in targets for user_id in row])
         target_list_lines = [f"*Current Assassin Targets in <#{channel_id}>:*"]
         for player_id, target_id in targets:
-            player_name = get_user_name(player_id)
-            target_name = get_user_name(target_id)
+            player_name = user_names[player_id]
+            target_name = user_names[target_id]
             target_list_lines.append(f"• {player_name} is targeting {target_name}")
 
         target_list_text = "\n".join(target_list_lines)
-        client.chat_postMessage(channel=user_id, text=target_list_text) # Send DM to admin
+        slack_call(client.chat_postMessage, channel=user_id, text=target_list_text) # Send DM to admin
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in assassin_targets_command: {error}")
-        client.chat_postMessage(channel=user_id, text="Sorry, I encountered an error fetching the target list.")
-    finally:
-        if cur is not None:
-             cur.close()
-        if conn is not None:
-             conn.close()
+        log.error("🔴 Error in assassin_targets_command: %s", error)
+        slack_call(client.chat_postMessage, channel=user_id, text="Sorry, I encountered an error fetching the target list.")
 
 def handle_assassin_help_command(message, say):
     """Displays the help message for the Assassin game."""
@@ -1220,6 +1587,7 @@ def handle_spot_help_command(message, say):
 • `alltimespotboard`: Show the all-time leaderboard of top spotters.
 • `alltimecaughtboard`: Show the all-time leaderboard of most spotted players.
 • `reset`: Manually end the current season and start a new one (admin only).
+• `refreshusers`: Forget cached user names so they are looked up again (admin only).
 • `miss you @user` or `i miss u @user`: Shows a random past spot picture of the mentioned user.
 • `mystats`: Shows your personal spotting stats in this channel.
 • `explode @user`: Overlays a random explosion on a random spot picture of the mentioned user.
@@ -1231,8 +1599,9 @@ def handle_spot_help_command(message, say):
 def handle_daily_bonus_command(message, say):
     """Displays the current daily bonus targets for the channel."""
     channel_id = message['channel']
-    if channel_id in daily_bonus_users and daily_bonus_users[channel_id]:
-        targets = list(daily_bonus_users[channel_id])
+    bonus_targets = daily_bonus_users.get(channel_id)
+    if bonus_targets:
+        targets = list(bonus_targets)
         user1_name = get_user_name(targets[0])
         user2_name = get_user_name(targets[1])
         say(f"Today's bonus targets are *{user1_name}* and *{user2_name}*! Spots of them are worth 2 points.")
@@ -1242,24 +1611,6 @@ def handle_daily_bonus_command(message, say):
 
 # --- Keyword Listeners ---
 
-# ... (Existing Spot Bot listeners)
-@app.message(re.compile(r"^spotboard$", re.IGNORECASE))
-def handle_spotboard_keyword(message, say):
-    handle_spotboard_command(message, say)
-
-@app.message(re.compile(r"^caughtboard$", re.IGNORECASE))
-def handle_caughtboard_keyword(message, say):
-    handle_caughtboard_command(message, say)
-
-@app.message(re.compile(r"^(alltimespotboard|all time spot board)$", re.IGNORECASE))
-def handle_alltime_spotboard_keyword(message, say):
-    handle_alltime_spotboard_command(message, say)
-
-@app.message(re.compile(r"^(alltimecaughtboard|all time caught board)$", re.IGNORECASE))
-def handle_alltime_caughtboard_keyword(message, say):
-    handle_alltime_caughtboard_command(message, say)
-
-@app.message(re.compile(r"^reset$", re.IGNORECASE))
 def handle_reset_request(message, client):
     # --- ADMIN CHECK ---
     if message['user'] != ADMIN_USER_ID:
@@ -1278,37 +1629,72 @@ def handle_reset_request(message, client):
             blocks=[{"type": "section", "text": {"type": "mrkdwn", "text": "Are you sure you want to reset the seasonal leaderboards? This will announce the winner of the current interim season and start a fresh board."}}, {"type": "actions", "elements": [{"type": "button", "text": {"type": "plain_text", "text": "Confirm Reset"}, "style": "danger", "action_id": "confirm_reset_action"}, {"type": "button", "text": {"type": "plain_text", "text": "Cancel"}, "action_id": "cancel_reset_action"}]}]
         )
     except Exception as e:
-        print(f"🔴 Error sending reset confirmation: {e}")
+        log.error("🔴 Error sending reset confirmation: %s", e)
+
+def handle_refresh_users_command(message, say, client):
+    """Admin command to drop all cached user names so they are fetched fresh from Slack."""
+    # --- ADMIN CHECK ---
+    if message['user'] != ADMIN_USER_ID:
+        client.chat_postEphemeral(
+            channel=message['channel'],
+            user=message['user'],
+            text="Sorry, this is an admin-only command."
+        )
+        return
+    # --- END ADMIN CHECK ---
+    with user_cache_lock:
+        cleared_count = len(user_cache)
+        user_cache.clear()
+    log.info("--- User name cache cleared (%s entries) by %s ---", cleared_count, message['user'])
+    say(f"✅ Cleared {cleared_count} cached user names. They'll be refreshed from Slack on next use.")
+
+# Commands that are a whole message on their own, looked up by exact (lowercased) text.
+# Shared with handle_mention. Every entry takes (message, say, client).
+KEYWORD_COMMANDS = {
+    # Spot Bot commands
+    "spotboard": lambda message, say, client: handle_spotboard_command(message, say),
+    "caughtboard": lambda message, say, client: handle_caughtboard_command(message, say),
+    "alltimespotboard": lambda message, say, client: handle_alltime_spotboard_command(message, say),
+    "all time spot board": lambda message, say, client: handle_alltime_spotboard_command(message, say),
+    "alltimecaughtboard": lambda message, say, client: handle_alltime_caughtboard_command(message, say),
+    "all time caught board": lambda message, say, client: handle_alltime_caughtboard_command(message, say),
+    "reset": lambda message, say, client: handle_reset_request(message, client),
+    "refreshusers": handle_refresh_users_command,
+    "mystats": lambda message, say, client: handle_mystats_command(message, say),
+    "help": lambda message, say, client: handle_spot_help_command(message, say),
+    "dailybonus": lambda message, say, client: handle_daily_bonus_command(message, say),
+    # Assassin game commands
+    "assassin target": handle_assassin_target_command,
+    "mytarget": handle_assassin_target_command,
+    "assassin alive": lambda message, say, client: handle_assassin_alive_command(message, say),
+    "assassin dead": lambda message, say, client: handle_assassin_dead_command(message, say),
+    "assassin killcount": lambda message, say, client: handle_assassin_killcount_command(message, say),
+    "assassin end": lambda message, say, client: handle_assassin_end_request(message, client, say),
+    "assassin targets": lambda message, say, client: handle_assassin_targets_command(message, client),
+    "assassin help": lambda message, say, client: handle_assassin_help_command(message, say),
+}
+
+def is_keyword_command(message):
+    return message.get("text", "").strip().lower() in KEYWORD_COMMANDS
+
+# One listener routes every exact-text command with a dict lookup instead of a regex per command
+@app.message(matchers=[is_keyword_command])
+def handle_keyword_command(message, say, client):
+    KEYWORD_COMMANDS[message["text"].strip().lower()](message, say, client)
 
 @app.message(re.compile(r"^(i miss (you|u)|miss (you|u))", re.IGNORECASE))
 def handle_miss_you_keyword(message, say):
     handle_miss_you_command(message, say)
 
-@app.message(re.compile(r"^mystats$", re.IGNORECASE))
-def handle_mystats_keyword(message, say):
-    handle_mystats_command(message, say)
-
 @app.message(re.compile(r"^explode", re.IGNORECASE))
 def handle_explode_keyword(message, say, client):
     handle_explode_command(message, say, client)
 
-@app.message(re.compile(r"^help$", re.IGNORECASE))
-def handle_spot_help_keyword(message, say):
-    handle_spot_help_command(message, say)
-
-@app.message(re.compile(r"^dailybonus$", re.IGNORECASE))
-def handle_daily_bonus_keyword(message, say):
-    handle_daily_bonus_command(message, say)
-
 # Assassin Game Keyword Listeners
 @app.message(re.compile(r"^assassin start", re.IGNORECASE))
 def handle_assassin_start_keyword(message, say, client):
     handle_assassin_start_command(message, say, client)
 
-@app.message(re.compile(r"^(assassin target|mytarget)$", re.IGNORECASE))
-def handle_assassin_target_keyword(message, say, client):
-    handle_assassin_target_command(message, say, client)
-
 @app.message(re.compile(r"^(eliminated|eliminate)", re.IGNORECASE))
 def handle_eliminated_keyword(message, say, client):
     # This might need adjustment if "eliminate" is used elsewhere
@@ -1316,30 +1702,6 @@ def handle_eliminated_keyword(message, say, client):
     # For now, assuming any "eliminated" refers to assassin.
     handle_eliminated_command(message, say, client)
 
-@app.message(re.compile(r"^assassin alive$", re.IGNORECASE))
-def handle_assassin_alive_keyword(message, say):
-    handle_assassin_alive_command(message, say)
-
-@app.message(re.compile(r"^assassin dead$", re.IGNORECASE))
-def handle_assassin_dead_keyword(message, say):
-    handle_assassin_dead_command(message, say)
-
-@app.message(re.compile(r"^assassin killcount$", re.IGNORECASE))
-def handle_assassin_killcount_keyword(message, say):
-    handle_assassin_killcount_command(message, say)
-
-@app.message(re.compile(r"^assassin end$", re.IGNORECASE))
-def handle_assassin_end_keyword(message, client, say):
-    handle_assassin_end_request(message, client, say)
-
-@app.message(re.compile(r"^assassin targets$", re.IGNORECASE))
-def handle_assassin_targets_keyword(message, client):
-    handle_assassin_targets_command(message, client)
-
-@app.message(re.compile(r"^assassin help$", re.IGNORECASE))
-def handle_assassin_help_keyword(message, say):
-    handle_assassin_help_command(message, say)
-
 
 # --- Action (Button Click) Listeners ---
 # ... (Existing reset listeners)
@@ -1357,15 +1719,22 @@ def handle_confirm_reset_action(ack, body, client):
         season_to_end_id = get_current_season_id()
         announce_season_winner(season_to_end_id, channel_id, is_manual_reset=True)
 
-        manual_reset_timestamps[channel_id] = datetime.now(pytz.timezone('America/Los_Angeles'))
-        print(f"--- MANUAL RESET: Reset timestamp set for channel {channel_id} ---")
+        with db_cursor() as cur:
+            cur.execute("""
+                INSERT INTO channel_resets (channel_id, season_id, reset_at) VALUES (%s, %s, NOW())
+                ON CONFLICT (channel_id) DO UPDATE SET season_id = EXCLUDED.season_id, reset_at = EXCLUDED.reset_at
+                RETURNING reset_at
+            """, (channel_id, season_to_end_id))
+            manual_reset_timestamps[channel_id] = cur.fetchone()[0]
+        invalidate_leaderboards(channel_id)
+        log.info("--- MANUAL RESET: Reset timestamp set for channel %s ---", channel_id)
 
         client.chat_delete(
             channel=body['channel']['id'],
             ts=body['message']['ts']
         )
     except Exception as e:
-        print(f"🔴 Error in confirm_reset_action: {e}")
+        log.error("🔴 Error in confirm_reset_action: %s", e)
 
 @app.action("cancel_reset_action")
 def handle_cancel_reset_action(ack, body, client):
@@ -1376,7 +1745,7 @@ def handle_cancel_reset_action(ack, body, client):
             ts=body['message']['ts']
         )
     except Exception as e:
-        print(f"🔴 Error in cancel_reset_action: {e}")
+        log.error("🔴 Error in cancel_reset_action: %s", e)
 
 @app.action("confirm_end_assassin_action")
 def handle_confirm_end_action(ack, body, client, say):
@@ -1388,24 +1757,26 @@ def handle_confirm_end_action(ack, body, client, say):
     # Correct way to get ts for ephemeral message actions
     message_ts = body['container']['message_ts']
 
-    conn = None # Initialize conn outside try
-    cur = None # Initialize cur outside try
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
+        with db_cursor() as cur:
+            log.debug("--- Attempting to DELETE game data for channel %s ---", channel_id)
+            # Both tables are cleared in one round trip
+            cur.execute("""
+                WITH players AS (
+                    DELETE FROM assassin_players WHERE channel_id = %(channel_id)s RETURNING 1
+                ), eliminations AS (
+                    DELETE FROM assassin_eliminations WHERE channel_id = %(channel_id)s RETURNING 1
+                )
+                SELECT (SELECT count(*) FROM players), (SELECT count(*) FROM eliminations);
+                """, {"channel_id": channel_id})
+            players_deleted, eliminations_deleted = cur.fetchone()
+        invalidate_assassin_roster(channel_id)
 
-        print(f"--- DEBUG: Attempting to DELETE game data for channel {channel_id} ---")
-        cur.execute("DELETE FROM assassin_players WHERE channel_id = %s", (channel_id,))
-        players_deleted = cur.rowcount
-        cur.execute("DELETE FROM assassin_eliminations WHERE channel_id = %s", (channel_id,))
-        eliminations_deleted = cur.rowcount
-
-        conn.commit()
-        print(f"--- DEBUG: DELETEd {players_deleted} players and {eliminations_deleted} eliminations ---")
+        log.debug("--- DELETEd %s players and %s eliminations ---", players_deleted, eliminations_deleted)
 
 
         say(f"🛑 The Assassin game in this channel has been manually ended by <@{user_id}>.")
-        print(f"--- ASSASSIN GAME ENDED in channel {channel_id} by user {user_id} ---")
+        log.info("--- ASSASSIN GAME ENDED in channel %s by user %s ---", channel_id, user_id)
 
         # Delete the original ephemeral confirmation message
         # We put this *after* the critical DB operations
@@ -1415,16 +1786,9 @@ def handle_confirm_end_action(ack, body, client, say):
         )
 
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"🔴 Error in confirm_end_assassin_action: {error}")
+        log.error("🔴 Error in confirm_end_assassin_action: %s", error)
         # Try to inform the user even if the main action failed
         # No need to post another error message here if deletion fails
-    finally:
-        # Ensure the database connection is always closed
-        if cur is not None:
-            cur.close()
-        if conn is not None:
-            conn.close()
-        print("--- DEBUG: Database connection closed in confirm_end_assassin_action ---")
 
 
 @app.action("cancel_end_assassin_action")
@@ -1442,8 +1806,27 @@ def handle_cancel_end_action(ack, body, client):
             ts=message_ts # Use the correctly retrieved timestamp
         )
     except Exception as e:
-        print(f"🔴 Error in cancel_end_assassin_action: {e}")
-
+        log.error("🔴 Error in cancel_end_assassin_action: %s", e)
+
+
+def run_test_bonus_command(event, say, client):
+    say("Sure, I'll run the daily bonus job for you right now. Check the channel for an announcement if it's eligible.")
+    daily_bonus_job()
+
+# Mention commands are looked up by exact text first, then by prefix.
+# Every entry takes (event, say, client); the exact ones are the keyword commands plus a few extras.
+MENTION_COMMANDS = {
+    **KEYWORD_COMMANDS,
+    # Mention-only commands
+    "test bonus": run_test_bonus_command,
+    "": lambda event, say, client: handle_spot_help_command(event, say), # Only the mention
+}
+MENTION_PREFIX_COMMANDS = (
+    ("assassin start", handle_assassin_start_command),
+    ("eliminate", handle_eliminated_command), # Also matches "eliminated"
+    ("explode", handle_explode_command),
+    ("miss", lambda event, say, client: handle_miss_you_command(event, say)), # Matches "miss you", "miss u" etc.
+)
 
 @app.event("app_mention")
 def handle_mention(event, say, client):
@@ -1454,80 +1837,48 @@ def handle_mention(event, say, client):
     # Extract the actual text after the mention
     # Example: "<@BOTID> help" -> "help"
     # Example: "<@BOTID>" -> ""
-    command_part = re.sub(r'^<@\w+>\s*', '', command_text).strip()
-
-    # Assassin game commands via mention
-    if command_part.startswith("assassin start"):
-        handle_assassin_start_command(event, say, client)
-    elif command_part == "assassin target" or command_part == "mytarget":
-        handle_assassin_target_command(event, say, client)
-    elif command_part.startswith("eliminated") or command_part.startswith("eliminate"):
-        handle_eliminated_command(event, say, client)
-    elif command_part == "assassin alive":
-         handle_assassin_alive_command(event, say)
-    elif command_part == "assassin dead":
-         handle_assassin_dead_command(event, say)
-    elif command_part == "assassin killcount":
-         handle_assassin_killcount_command(event, say)
-    elif command_part == "assassin end":
-         handle_assassin_end_request(event, client, say)
-    elif command_part == "assassin targets": # New admin command
-         handle_assassin_targets_command(event, client)
-    elif command_part == "assassin help": # New help command
-         handle_assassin_help_command(event, say)
-    # Existing Spot Bot commands via mention
-    elif command_part.startswith("explode"):
-        handle_explode_command(event, say, client)
-    elif command_part == "mystats":
-        handle_mystats_command(event, say)
-    elif command_part.startswith("miss"): # Matches "miss you", "miss u" etc.
-        handle_miss_you_command(event, say)
-    elif command_part == "alltimecaughtboard" or command_part == "all time caught board":
-        handle_alltime_caughtboard_command(event, say)
-    elif command_part == "alltimespotboard" or command_part == "all time spot board":
-        handle_alltime_spotboard_command(event, say)
-    elif command_part == "caughtboard":
-        handle_caughtboard_command(event, say)
-    elif command_part == "spotboard":
-        handle_spotboard_command(event, say)
-    elif command_part == "test bonus":
-        say("Sure, I'll run the daily bonus job for you right now. Check the channel for an announcement if it's eligible.")
-        daily_bonus_job()
-    elif command_part == "dailybonus": # New command
-        handle_daily_bonus_command(event, say)
-    elif command_part == "help" or command_part == "": # Check for just "help" or only the mention
-        handle_spot_help_command(event, say)
-    else: # Default fallback if no other command matches
-        handle_spot_help_command(event, say) # Show general help by default
+    command_part = LEADING_MENTION_RE.sub('', command_text).strip()
+
+    handler = MENTION_COMMANDS.get(command_part)
+    if handler is None:
+        handler = next((prefix_handler for prefix, prefix_handler in MENTION_PREFIX_COMMANDS if command_part.startswith(prefix)), None)
+    if handler is None: # Default fallback if no other command matches
+        handler = MENTION_COMMANDS["help"] # Show general help by default
+    handler(event, say, client)
 
 
 # --- Main Application Execution ---
 if __name__ == "__main__":
     setup_database()
+    load_spot_message_timestamps()
+    load_manual_resets()
+    warm_user_cache()
+
+    # A job that was missed (e.g. during a restart) still runs once within the hour, but never twice
+    scheduler = BackgroundScheduler(
+        timezone=LA_TZ,
+        job_defaults={'misfire_grace_time': 3600, 'coalesce': True, 'max_instances': 1}
+    )
 
-    scheduler = BackgroundScheduler(timezone=pytz.timezone('America/Los_Angeles'))
-
+    # The season end and daily bonus both run at LA midnight, so they share one daily trigger
     scheduler.add_job(
-        end_of_season_job,
+        midnight_jobs,
         'cron',
-        day_of_week='thu',
         hour=0,
-        minute=0,
-        week='*/2',
-        start_date='2025-10-09 00:00:00'
+        minute=0
     )
 
+    # Keeps names (and name changes) fresh so board renders rarely need a users.info call
     scheduler.add_job(
-        daily_bonus_job,
-        'cron',
-        hour=0,
-        minute=0
+        warm_user_cache,
+        'interval',
+        minutes=USER_CACHE_REFRESH_MINUTES
     )
 
     scheduler.start()
-    print("⏰ Scheduler started. All jobs are scheduled.")
+    log.info("⏰ Scheduler started. All jobs are scheduled.")
 
-    print("⚡️ Spot Bot is running!")
-    handler = SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"])
+    log.info("⚡️ Spot Bot is running!")
+    handler = SocketModeHandler(app, SLACK_APP_TOKEN)
     handler.start()
 